@@ -0,0 +1,260 @@
+import os
+from functools import partial
+import numpy as np
+from PIL import Image
+import gestures
+import utils
+from gallery_grid import GridLayout, ThumbnailIndex
+from thumbnail_cache import ThumbnailCache, decode_thumbnail
+from viewer import ZoomView, _pyramid_executor
+
+# (name, setup) pairs; setup(workdir) prepares the inputs outside the timing and returns the function to time
+CASES = []
+
+FRAME_SIZE = (400, 400)
+STREAM_FRAMES = 1000
+THUMBNAIL_COUNTS = (10, 1000, 10000)
+LARGE_IMAGE_SIZE = (6000, 4000)
+
+# Open right hand pointing up, in pixels relative to the wrist
+OPEN_HAND = np.array([
+    (0, 0),
+    (-25, -15), (-45, -35), (-60, -55), (-70, -75),       # Thumb
+    (-25, -70), (-28, -100), (-30, -120), (-32, -138),    # Index finger
+    (-5, -75), (-5, -108), (-5, -130), (-5, -150),        # Middle finger
+    (15, -70), (17, -100), (18, -120), (19, -136),        # Ring finger
+    (32, -60), (36, -82), (38, -98), (40, -112),          # Little finger
+], dtype=np.float32)
+
+
+def case(name):
+    def register(setup):
+        CASES.append((name, setup))
+        return setup
+    return register
+
+
+def landmark_stream(frames=STREAM_FRAMES, seed=0):
+    """(frames, 21, 2) pixel landmarks of a hand that drifts around the frame and pinches on and off.
+
+    The thumb tip moves between its open position and the index fingertip,
+    so the click, scroll and zoom rules switch between true and false
+    along the stream. Coordinates are truncated like live landmarks.
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(frames, dtype=np.float32)
+    points = np.repeat(OPEN_HAND[np.newaxis], frames, axis=0)
+
+    pinch = (np.sin(t / 15) + 1) / 2
+    points[:, 4] += pinch[:, np.newaxis] * (OPEN_HAND[8] - OPEN_HAND[4])
+
+    wrist = np.stack([200 + 80 * np.sin(t / 40), 320 + 40 * np.sin(t / 25)], axis=1)
+    points += wrist[:, np.newaxis]
+    points += rng.normal(0, 1.5, points.shape)
+    return np.trunc(np.clip(points, 0, FRAME_SIZE[0] - 1)).astype(np.float32)
+
+
+def _hands():
+    # Plain [x, y] lists, the landmark format the predicates were written for
+    return landmark_stream().tolist()
+
+
+@case("utils.calculate_distance")
+def _calculate_distance(workdir):
+    pairs = [(hand[4], hand[8]) for hand in _hands()]
+    return lambda: [utils.calculate_distance(a, b) for a, b in pairs]
+
+
+@case("utils.calculate_angle")
+def _calculate_angle(workdir):
+    triples = [(hand[5], hand[6], hand[8]) for hand in _hands()]
+    return lambda: [utils.calculate_angle(a, b, c) for a, b, c in triples]
+
+
+@case("gestures.is_click_gesture")
+def _is_click_gesture(workdir):
+    hands = _hands()
+    return lambda: [gestures.is_click_gesture(hand) for hand in hands]
+
+
+@case("gestures.is_scroll_gesture")
+def _is_scroll_gesture(workdir):
+    hands = _hands()
+    return lambda: [gestures.is_scroll_gesture(hand) for hand in hands]
+
+
+@case("gestures.is_zoom_detected")
+def _is_zoom_detected(workdir):
+    hands = _hands()
+    return lambda: [gestures.is_zoom_detected(hand) for hand in hands]
+
+
+@case("gestures.is_hover_gesture")
+def _is_hover_gesture(workdir):
+    # A list of boxes like the old get_thumbnail_positions, for a window of 30 thumbnails
+    layout = GridLayout()
+    boxes = [layout.cell_box(index) for index in range(30)]
+    hands = _hands()
+    return lambda: [gestures.is_hover_gesture(hand, boxes) for hand in hands]
+
+
+@case("gestures.detect_scroll_direction")
+def _detect_scroll_direction(workdir):
+    hands = _hands()
+
+    def run():
+        x = y = None
+        for hand in hands:
+            _, x, y = gestures.detect_scroll_direction(hand, x, y)
+    return run
+
+
+@case("gestures.detect_zoom_direction")
+def _detect_zoom_direction(workdir):
+    hands = _hands()
+
+    def run():
+        distance = None
+        for hand in hands:
+            _, distance = gestures.detect_zoom_direction(hand, distance)
+    return run
+
+
+@case("gestures.evaluate_hands")
+def _evaluate_hands(workdir):
+    points = landmark_stream()
+    return lambda: gestures.evaluate_hands(points)
+
+
+def _photo(size, seed=0):
+    # Noise over gradients compresses about like a photo, unlike a flat color
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 255, size[0], dtype=np.float32)
+    y = np.linspace(0, 255, size[1], dtype=np.float32)[:, np.newaxis]
+    pixels = np.stack([x + 0 * y, y + 0 * x, (x + y) / 2], axis=2) + rng.normal(0, 12, (size[1], size[0], 3))
+    return Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8), "RGB")
+
+
+def _photo_files(workdir, count=8, size=(3000, 2000)):
+    folder = os.path.join(workdir, "photos")
+    if not os.path.isdir(folder):
+        os.makedirs(folder)
+        image = _photo(size)
+        for i in range(count):
+            image.save(os.path.join(folder, f"photo{i}.jpg"), quality=90)
+    return sorted(os.path.join(folder, name) for name in os.listdir(folder))
+
+
+@case("thumbnails.decode")
+def _decode_thumbnails(workdir):
+    # What load_images pays for every photo that is not in the cache yet
+    paths = _photo_files(workdir)
+    return lambda: [decode_thumbnail(path, (100, 100)) for path in paths]
+
+
+@case("thumbnails.cache_hit")
+def _cached_thumbnails(workdir):
+    # What load_images pays on the next start, when every thumbnail is cached
+    paths = _photo_files(workdir)
+    cache = ThumbnailCache(os.path.join(workdir, "thumbnail-cache"))
+    for path in paths:
+        cache.get_thumbnail(path)
+    return lambda: [cache.get_thumbnail(path) for path in paths]
+
+
+def _zoom_view():
+    view = ZoomView(_photo(LARGE_IMAGE_SIZE), viewport=(400, 300))
+    _pyramid_executor.submit(lambda: None).result()  # The single builder worker is done once this has run
+    return view
+
+
+@case("viewer.zoom_in")
+def _zoom_in(workdir):
+    # Ten zoom_in steps from the fitted view, each rendered like _update_image_in_fixed_window does
+    view = _zoom_view()
+
+    def run():
+        view.zoom = 1.0
+        for _ in range(10):
+            view.zoom_by(1.2)
+            view.render()
+    return run
+
+
+@case("viewer.zoom_out")
+def _zoom_out(workdir):
+    view = _zoom_view()
+
+    def run():
+        view.zoom = 1.2 ** 10
+        for _ in range(10):
+            view.zoom_by(0.8)
+            view.render()
+    return run
+
+
+class _FixedCanvas:
+    # The few canvas calls ThumbnailIndex makes, answered for a canvas scrolled to the middle of the grid
+    def __init__(self, scroll_y, size=(780, 600)):
+        self.scroll_y = scroll_y
+        self.size = size
+
+    def winfo_rootx(self):
+        return 200
+
+    def winfo_rooty(self):
+        return 50
+
+    def winfo_width(self):
+        return self.size[0]
+
+    def winfo_height(self):
+        return self.size[1]
+
+    def canvasx(self, x):
+        return x
+
+    def canvasy(self, y):
+        return y + self.scroll_y
+
+
+class _Root:
+    def winfo_rootx(self):
+        return 0
+
+    def winfo_rooty(self):
+        return 0
+
+
+class _Gallery:
+    # What ThumbnailIndex reads from VirtualGallery, without a Tk window
+    def __init__(self, count):
+        self.count = count
+        self.layout = GridLayout()
+        self.canvas = _FixedCanvas(max(0, self.layout.size(count)[1] // 2 - 300))
+
+    def __len__(self):
+        return self.count
+
+
+def _thumbnail_positions(count, workdir):
+    # get_thumbnail_positions after a scroll or resize, with every box read back
+    index = ThumbnailIndex(_Gallery(count), _Root())
+
+    def run():
+        index.invalidate()
+        return list(index)
+    return run
+
+
+def _detect_hover(count, workdir):
+    # One detect_hover per frame of the landmark stream, at the index fingertip spread over the canvas
+    index = ThumbnailIndex(_Gallery(count), _Root())
+    tips = landmark_stream()[:, 8] * (780 / FRAME_SIZE[0], 600 / FRAME_SIZE[1]) + (200, 50)
+    cursors = tips.tolist()
+    return lambda: [index.index_at(x, y) for x, y in cursors]
+
+
+for _count in THUMBNAIL_COUNTS:
+    case(f"gallery.thumbnail_positions[{_count}]")(partial(_thumbnail_positions, _count))
+    case(f"gallery.detect_hover[{_count}]")(partial(_detect_hover, _count))
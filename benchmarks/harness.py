@@ -0,0 +1,80 @@
+import gc
+import json
+import math
+import platform
+import statistics
+import time
+from collections import namedtuple
+
+# Seconds per call, over the timed rounds of one benchmark
+Stats = namedtuple("Stats", "rounds iterations min max mean median stddev")
+
+
+def measure(func, max_time=1.0, min_rounds=5, max_rounds=10000, min_round_time=0.005):
+    """Time func() the way pytest-benchmark does and return its Stats.
+
+    After one warm-up call, the number of calls per round is calibrated so a
+    round lasts at least min_round_time, which keeps timer resolution out of
+    fast benchmarks. Rounds are repeated for about max_time seconds, but at
+    least min_rounds times.
+    """
+    timer = time.perf_counter
+    func()
+
+    iterations = 1
+    while True:
+        start = timer()
+        for _ in range(iterations):
+            func()
+        elapsed = timer() - start
+        if elapsed >= min_round_time:
+            break
+        iterations = max(iterations * 2, int(iterations * min_round_time / max(elapsed, 1e-9)))
+
+    rounds = max(min_rounds, min(max_rounds, int(max_time / elapsed)))
+    times = []
+    gc.collect()
+    for _ in range(rounds):
+        start = timer()
+        for _ in range(iterations):
+            func()
+        times.append((timer() - start) / iterations)
+    return Stats(rounds, iterations, min(times), max(times), statistics.fmean(times),
+                 statistics.median(times), statistics.stdev(times) if rounds > 1 else 0.0)
+
+
+def machine_info():
+    return {"python": platform.python_version(), "platform": platform.platform(), "processor": platform.processor()}
+
+
+def save_baseline(path, results):
+    """Write {name: Stats} as the baseline of later runs."""
+    data = {"machine": machine_info(), "benchmarks": {name: stats._asdict() for name, stats in results.items()}}
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+
+def load_baseline(path):
+    """Return (machine info, {name: Stats}) of a baseline file."""
+    with open(path) as f:
+        data = json.load(f)
+    return data.get("machine", {}), {name: Stats(**stats) for name, stats in data["benchmarks"].items()}
+
+
+def compare(results, baseline, statistic="median"):
+    """{name: change in percent} of every benchmark that is also in the baseline; positive is slower."""
+    changes = {}
+    for name, stats in results.items():
+        previous = baseline.get(name)
+        if previous is not None and getattr(previous, statistic) > 0:
+            changes[name] = (getattr(stats, statistic) / getattr(previous, statistic) - 1) * 100
+    return changes
+
+
+def format_time(seconds):
+    if seconds <= 0 or math.isnan(seconds):
+        return "0"
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3g}{unit}"
+    return f"{seconds / 1e-9:.3g}ns"
@@ -0,0 +1,65 @@
+import argparse
+import os
+import sys
+import tempfile
+
+# The benchmarks import the app modules from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from harness import compare, format_time, load_baseline, machine_info, measure, save_baseline
+from cases import CASES
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the gesture math, thumbnailing and viewer operations and compare them with a stored baseline")
+    parser.add_argument("-k", "--filter", default="", help="Only run benchmarks whose name contains this text")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file (default: benchmarks/baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline instead of comparing with it")
+    parser.add_argument("--threshold", type=float, default=20.0, help="Fail when a median is more than this many percent slower than the baseline")
+    parser.add_argument("--max-time", type=float, default=1.0, help="Approximate seconds spent timing each benchmark")
+    args = parser.parse_args()
+
+    cases = [(name, setup) for name, setup in CASES if args.filter in name]
+    if not cases:
+        parser.error(f'No benchmark matches "{args.filter}"')
+
+    baseline = {}
+    if not args.save_baseline and os.path.exists(args.baseline):
+        machine, baseline = load_baseline(args.baseline)
+        if machine != machine_info():
+            print(f"Warning: the baseline was recorded on another machine or Python ({machine}); comparisons may not be meaningful.")
+
+    results = {}
+    print(f"{'benchmark':<36}{'min':>10}{'median':>10}{'mean':>10}{'stddev':>10}{'rounds':>8}  vs baseline")
+    with tempfile.TemporaryDirectory(prefix="gallery-bench-") as workdir:
+        for name, setup in cases:
+            stats = results[name] = measure(setup(workdir), max_time=args.max_time)
+            change = compare({name: stats}, baseline).get(name)
+            verdict = "new" if change is None else f"{change:+.1f}%" + (" REGRESSION" if change > args.threshold else "")
+            print(f"{name:<36}{format_time(stats.min):>10}{format_time(stats.median):>10}{format_time(stats.mean):>10}"
+                  f"{format_time(stats.stddev):>10}{stats.rounds:>8}  {verdict}")
+
+    if args.save_baseline:
+        if args.filter and os.path.exists(args.baseline):
+            # Keep the entries of the benchmarks that were filtered out
+            _, previous = load_baseline(args.baseline)
+            results = {**previous, **results}
+        save_baseline(args.baseline, results)
+        print(f"Saved the baseline of {len(results)} benchmarks to {args.baseline}")
+        return 0
+
+    if not baseline:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one.")
+        return 0
+    regressions = [name for name, change in compare(results, baseline).items() if change > args.threshold]
+    if regressions:
+        print(f"{len(regressions)} benchmarks are more than {args.threshold:g}% slower than the baseline: {', '.join(regressions)}")
+        return 1
+    print(f"No benchmark is more than {args.threshold:g}% slower than the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import cv2
+from gesture_engine import MultiHandGestureEngine, event_name
+from gesture_classifier import load_classifier
+from hand_process import landmark_points
+from roi import HandROITracker
+
+
+class Segment:
+    """Frames [start, end) of a video whose events are reported from emit_from on.
+
+    The frames before emit_from only warm up the stateful detectors (the
+    gesture state machines and the scroll and zoom reference points) so that
+    a segment starts in the same state as if the whole file had been processed.
+    """
+
+    def __init__(self, path, start, end, emit_from, fps):
+        self.path = path
+        self.start = start
+        self.end = end        # None for "until the end of the file"
+        self.emit_from = emit_from
+        self.fps = fps
+
+
+def video_info(path):
+    """(frames per second, frame count) of a video; the count is 0 when the container does not say."""
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise ValueError(f"Cannot open video {path}")
+    try:
+        return capture.get(cv2.CAP_PROP_FPS) or 30.0, int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+    finally:
+        capture.release()
+
+
+def plan_segments(paths, segment_seconds=0.0, overlap_seconds=2.0):
+    """Split the videos into work items: one per file, or time segments of segment_seconds."""
+    segments = []
+    for path in paths:
+        fps, frame_count = video_info(path)
+        if segment_seconds <= 0 or frame_count <= 0:
+            segments.append(Segment(path, 0, None, 0, fps))
+            continue
+        length = max(1, int(segment_seconds * fps))
+        overlap = int(overlap_seconds * fps)
+        for start in range(0, frame_count, length):
+            segments.append(Segment(path, max(0, start - overlap), min(frame_count, start + length), start, fps))
+    return segments
+
+
+def extract_segment(segment, frame_size=(400, 400), mirror=True, max_num_hands=1, min_detection_confidence=0.7, roi_tracking=False, classifier_path=None):
+    """Run hand detection and the gesture engine over one segment.
+
+    Frames are resized (and mirrored) like the live camera feed, so the pixel
+    thresholds in gestures.py apply unchanged. Returns (events, frames) where
+    events are dicts ready to be written as JSON lines and frames is the
+    number of frames reported on, without the warm-up.
+    """
+    # MediaPipe is imported here so that only the worker processes load the model
+    import mediapipe as mp
+
+    hands = mp.solutions.hands.Hands(max_num_hands=max_num_hands, min_detection_confidence=min_detection_confidence)
+    locate = lambda image: landmark_points(hands.process(image))
+    search_hands = None
+    if roi_tracking:
+        search_hands = mp.solutions.hands.Hands(static_image_mode=True, max_num_hands=max_num_hands, min_detection_confidence=min_detection_confidence)
+        locate = HandROITracker(locate, lambda image: landmark_points(search_hands.process(image)), reset=hands.reset)
+
+    capture = cv2.VideoCapture(segment.path)
+    if segment.start:
+        capture.set(cv2.CAP_PROP_POS_FRAMES, segment.start)
+    classifier = load_classifier(classifier_path) if classifier_path else None
+    engine = MultiHandGestureEngine(classifier=classifier)
+    events = []
+    frame_index = segment.start
+    raw = None
+    try:
+        while segment.end is None or frame_index < segment.end:
+            ok, raw = capture.read(raw)
+            if not ok:
+                break
+            frame = cv2.resize(raw, frame_size)
+            if mirror:
+                frame = cv2.flip(frame, 1)
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+            # Video time drives the engine, so the events do not depend on how fast this machine is
+            now = frame_index / segment.fps
+            for hand_id, event in engine.process(locate(frame), frame_size, now):
+                name = event_name(event)
+                if name is not None and frame_index >= segment.emit_from:
+                    events.append({"file": segment.path, "frame": frame_index, "time": round(now, 3), "hand": hand_id,
+                                   "event": name, "gesture": event.gesture, "phase": event.phase, "value": event.value})
+            frame_index += 1
+    finally:
+        capture.release()
+        hands.close()
+        if search_hands is not None:
+            search_hands.close()
+    # Warm-up frames are counted by the segment before, which reports them
+    return events, max(0, frame_index - segment.emit_from)
+
+
+def _extract(args):
+    # Top-level so the process pool can pickle it
+    segment, options = args
+    return extract_segment(segment, **options)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract gesture events from video files without the GUI")
+    parser.add_argument("videos", nargs="+", help="Video files to process")
+    parser.add_argument("-o", "--output", default="-", help="JSON Lines file to write the events to (default: stdout)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Number of worker processes")
+    parser.add_argument("--segment-seconds", type=float, default=0.0, help="Split videos into segments of this length (0: one work item per file)")
+    parser.add_argument("--overlap-seconds", type=float, default=2.0, help="Warm-up time replayed before each segment for the stateful detectors")
+    parser.add_argument("--max-hands", type=int, default=1, help="Maximum number of hands to track")
+    parser.add_argument("--no-mirror", action="store_true", help="Do not mirror frames like the live camera preview")
+    parser.add_argument("--roi", action="store_true", help="Run hand inference on a crop around the tracked hand, which makes small or distant hands larger for the model")
+    parser.add_argument("--classifier", metavar="PATH", help="Use a classifier fitted by gesture_classifier.py instead of the hand-tuned rules")
+    args = parser.parse_args()
+
+    options = {"mirror": not args.no_mirror, "max_num_hands": args.max_hands, "roi_tracking": args.roi,
+               "classifier_path": args.classifier}
+    segments = plan_segments(args.videos, args.segment_seconds, args.overlap_seconds)
+
+    started = time.perf_counter()
+    frames = 0
+    count = 0
+    output = open(args.output, "w") if args.output != "-" else None
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            # map yields in submission order, so the event stream is ordered by file and time
+            for events, segment_frames in executor.map(_extract, [(segment, options) for segment in segments]):
+                frames += segment_frames
+                for event in events:
+                    line = json.dumps(event)
+                    if output is None:
+                        print(line)
+                    else:
+                        output.write(line + "\n")
+                count += len(events)
+    finally:
+        if output is not None:
+            output.close()
+
+    seconds = time.perf_counter() - started
+    print(f"{count} events from {frames} frames of {len(args.videos)} videos in {len(segments)} work items, "
+          f"{seconds:.1f}s ({frames / seconds if seconds else 0:.0f} frames/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import os
+import threading
+
+try:
+    # Optional: lets Linux report changes right away instead of at the next poll
+    from inotify_simple import INotify, flags
+except ImportError:
+    INotify = None
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+
+
+def scan_folder(folder):
+    """{path: (mtime_ns, size)} of the images directly inside folder."""
+    images = {}
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                try:
+                    if entry.is_file():
+                        stat = entry.stat()  # Cached by scandir on Windows, one syscall elsewhere
+                        images[entry.path] = (stat.st_mtime_ns, stat.st_size)
+                except OSError:
+                    pass  # Deleted between listing and stat
+    return images
+
+
+class FolderWatcher:
+    """Scans a folder in the background and reports image files that appear, change or disappear.
+
+    on_change(added, changed, removed) is called on the Tk thread through the
+    dispatcher with three lists of paths. Changes are found by comparing
+    scans: the folder is rescanned every interval seconds, or as soon as
+    inotify reports activity when inotify_simple is installed. The first
+    scan is compared with known ({path: (mtime_ns, size)}, e.g. from the
+    library index), so without it the first call holds every image in name
+    order. on_scan(images, added, changed, removed) is called on the watcher
+    thread after every scan that found a difference.
+    """
+
+    def __init__(self, folder, dispatcher, on_change, interval=1.0, known=None, on_scan=None):
+        self.folder = folder
+        self.dispatcher = dispatcher
+        self.on_change = on_change
+        self.on_scan = on_scan
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.images = dict(known or {})
+        self.thread = threading.Thread(target=self._run, name="folder-watch", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        inotify = None
+        if INotify is not None:
+            try:
+                inotify = INotify()
+                inotify.add_watch(self.folder, flags.CREATE | flags.DELETE | flags.MODIFY | flags.CLOSE_WRITE
+                                  | flags.MOVED_FROM | flags.MOVED_TO)
+            except OSError:
+                inotify = None  # E.g. the watch limit is reached; polling still works
+
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    self._rescan()
+                except OSError as e:
+                    print(f"Error scanning {self.folder}: {e}")
+                if inotify is not None:
+                    # Wait for activity, then a little longer so a burst of writes becomes one rescan
+                    if inotify.read(timeout=int(self.interval * 1000)):
+                        self.stop_event.wait(0.2)
+                        inotify.read(timeout=0)
+                else:
+                    self.stop_event.wait(self.interval)
+        finally:
+            if inotify is not None:
+                inotify.close()
+
+    def _rescan(self):
+        images = scan_folder(self.folder)
+        previous = self.images
+        added = sorted(path for path in images if path not in previous)
+        removed = [path for path in previous if path not in images]
+        changed = [path for path, stat in images.items() if path in previous and previous[path] != stat]
+        self.images = images
+        if (added or changed or removed) and not self.stop_event.is_set():
+            if self.on_scan is not None:
+                self.on_scan(images, added, changed, removed)
+            self.dispatcher.post(self._deliver, added, changed, removed)
+
+    def _deliver(self, added, changed, removed):
+        if not self.stop_event.is_set():
+            self.on_change(added, changed, removed)
+
+    def stop(self, wait=False):
+        """Stop watching; with wait, also wait until the watcher thread, and so on_scan, has finished."""
+        self.stop_event.set()
+        if wait:
+            self.thread.join()
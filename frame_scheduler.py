@@ -0,0 +1,77 @@
+import time
+from instrumentation import profiler
+
+
+class FrameScheduler:
+    """Paces the GUI frame loop to a target FPS instead of a fixed delay.
+
+    Each iteration is measured between begin() and end(); end() returns how
+    long to wait so that iterations start once per frame budget. When the
+    loop falls behind, optional stages are dropped: first the overlay
+    drawing, then every other camera preview update. Achieved FPS and the
+    capture-to-action latency are kept as moving averages and published as
+    profiler gauges; every latency sample is also recorded as a profiler
+    stage, so its percentiles are shown and exported with the others.
+    """
+
+    def __init__(self, target_fps=30, poll_ms=5, smoothing=0.1):
+        self.frame_budget = 1.0 / target_fps
+        self.poll_ms = poll_ms        # Delay before checking again when no new frame was ready
+        self.smoothing = smoothing    # Weight of the newest sample in the moving averages
+        self.fps = 0.0                # Achieved frames per second
+        self.frame_time = 0.0         # Seconds spent handling one frame on the Tk thread
+        self.latency = None           # Seconds from camera capture to the resulting GUI action
+        self.last_latency = None
+        self.overload = 0             # 0: on time, 1: overlays dropped, 2: preview updates halved too
+        self.skipped_displays = 0
+        self._begin_time = None
+        self._last_frame_time = None
+        self._display_toggle = False
+
+    def _average(self, current, sample):
+        return sample if not current else current + self.smoothing * (sample - current)
+
+    def begin(self):
+        """Mark the start of handling a new frame."""
+        now = time.perf_counter()
+        if self._last_frame_time is not None:
+            self.fps = self._average(self.fps, 1.0 / max(now - self._last_frame_time, 1e-6))
+        self._last_frame_time = now
+        self._begin_time = now
+        profiler.set_gauge("fps", self.fps)
+
+    def should_draw_overlay(self):
+        return self.overload == 0
+
+    def should_display(self):
+        """Whether to update the camera preview for this frame."""
+        if self.overload < 2:
+            return True
+        self._display_toggle = not self._display_toggle
+        if not self._display_toggle:
+            self.skipped_displays += 1
+            profiler.set_gauge("skipped previews", self.skipped_displays)
+        return self._display_toggle
+
+    def record_action(self, capture_timestamp):
+        """Note that a GUI action was triggered by the frame captured at capture_timestamp (time.time())."""
+        self.last_latency = time.time() - capture_timestamp
+        self.latency = self._average(self.latency, self.last_latency)
+        if profiler.enabled:
+            profiler.record("capture->action", self.last_latency)
+        profiler.set_gauge("latency ms", self.latency * 1000)
+
+    def end(self):
+        """Finish the frame and return the delay in ms before the next iteration."""
+        elapsed = time.perf_counter() - self._begin_time
+        self.frame_time = self._average(self.frame_time, elapsed)
+
+        # Decide on the averaged cost, so a single slow frame does not flip the quality
+        if self.frame_time > 1.5 * self.frame_budget:
+            self.overload = 2
+        elif self.frame_time > 0.8 * self.frame_budget:
+            self.overload = 1
+        else:
+            self.overload = 0
+
+        return max(1, int((self.frame_budget - elapsed) * 1000))
@@ -0,0 +1,163 @@
+import glob
+import os
+import time
+from abc import ABC, abstractmethod
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+class FrameSource(ABC):
+    """Where the gesture pipeline gets its BGR frames from.
+
+    The interface is the part of cv2.VideoCapture the pipeline uses:
+    read(image=None) returns (ok, frame) and may fill image in place when it
+    has the right shape, and release() frees the source. After a finite
+    source runs out, read() returns (False, None) and finished is True.
+    """
+
+    finished = False
+
+    @abstractmethod
+    def read(self, image=None):
+        pass
+
+    def release(self):
+        pass
+
+
+class _Pacer:
+    # Sleeps so that consecutive frames are delivered at most fps times per second
+    def __init__(self, fps):
+        self.interval = 1.0 / fps if fps else 0.0
+        self.next_time = None
+
+    def wait(self):
+        now = time.perf_counter()
+        if self.next_time is not None and now < self.next_time:
+            time.sleep(self.next_time - now)
+            now = self.next_time
+        self.next_time = now + self.interval
+
+
+class CameraSource(FrameSource):
+    """A live webcam."""
+
+    def __init__(self, index=0):
+        self.capture = cv2.VideoCapture(index)
+
+    def read(self, image=None):
+        return self.capture.read(image)
+
+    def release(self):
+        self.capture.release()
+
+
+class VideoFileSource(FrameSource):
+    """A video file, decoded as fast as possible or paced at its own frame rate when realtime is set."""
+
+    def __init__(self, path, realtime=False, loop=False):
+        self.path = path
+        self.capture = cv2.VideoCapture(path)
+        if not self.capture.isOpened():
+            raise ValueError(f"Cannot open video {path}")
+        fps = self.capture.get(cv2.CAP_PROP_FPS) or 30
+        self.pacer = _Pacer(fps) if realtime else None
+        self.loop = loop
+
+    def read(self, image=None):
+        if self.pacer is not None:
+            self.pacer.wait()
+        ok, frame = self.capture.read(image)
+        if not ok and self.loop:
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self.capture.read(image)
+        if not ok:
+            self.finished = True
+        return ok, frame
+
+    def release(self):
+        self.capture.release()
+
+
+class ImageSequenceSource(FrameSource):
+    """The image files of a directory (in name order) or an explicit list of paths, played as frames."""
+
+    def __init__(self, paths, fps=30, realtime=False, loop=False):
+        if isinstance(paths, str):
+            paths = sorted(path for path in glob.glob(os.path.join(paths, "*")) if path.lower().endswith(IMAGE_EXTENSIONS))
+        self.paths = list(paths)
+        if not self.paths:
+            raise ValueError("Image sequence is empty")
+        self.pacer = _Pacer(fps) if realtime else None
+        self.loop = loop
+        self.position = 0
+
+    def read(self, image=None):
+        if self.position == len(self.paths):
+            if not self.loop:
+                self.finished = True
+                return False, None
+            self.position = 0
+        if self.pacer is not None:
+            self.pacer.wait()
+        frame = cv2.imread(self.paths[self.position])
+        self.position += 1
+        if frame is None:
+            print(f"Could not read frame {self.paths[self.position - 1]}")
+            return False, None
+        if image is not None and image.shape == frame.shape:
+            np.copyto(image, frame)
+            return True, image
+        return True, frame
+
+
+class SyntheticSource(FrameSource):
+    """Generated frames with a moving disc, for running the pipeline without any camera or footage.
+
+    frames limits the length of the stream (None runs until stopped).
+    Without realtime the frames are produced as fast as they are read.
+    """
+
+    def __init__(self, size=(640, 480), fps=30, frames=None, realtime=False):
+        self.size = size
+        self.frames = frames
+        self.pacer = _Pacer(fps) if realtime else None
+        self.count = 0
+
+    def read(self, image=None):
+        if self.frames is not None and self.count >= self.frames:
+            self.finished = True
+            return False, None
+        if self.pacer is not None:
+            self.pacer.wait()
+        width, height = self.size
+        if image is None or image.shape != (height, width, 3):
+            image = np.empty((height, width, 3), dtype=np.uint8)
+        image[:] = (40, 40, 40)
+        # The disc circles around the frame center, so consecutive frames differ
+        angle = self.count * 0.1
+        center = (int(width / 2 + width / 4 * np.cos(angle)), int(height / 2 + height / 4 * np.sin(angle)))
+        cv2.circle(image, center, min(width, height) // 10, (120, 160, 220), -1)
+        cv2.putText(image, str(self.count), (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+        self.count += 1
+        return True, image
+
+
+def open_source(spec, realtime=True, loop=False):
+    """Create a frame source from a command-line spec.
+
+    "camera" or "camera:N" opens webcam N, "synthetic" or "synthetic:FRAMES"
+    generates frames, a directory is played as an image sequence and any
+    other path is opened as a video file. Without realtime, files and
+    synthetic frames are delivered as fast as the pipeline reads them.
+    """
+    kind, _, argument = spec.partition(":")
+    if kind == "camera":
+        return CameraSource(int(argument or 0))
+    if kind == "synthetic":
+        return SyntheticSource(frames=int(argument) if argument else None, realtime=realtime)
+    if os.path.isdir(spec):
+        return ImageSequenceSource(spec, realtime=realtime, loop=loop)
+    return VideoFileSource(spec, realtime=realtime, loop=loop)
@@ -0,0 +1,406 @@
+import os
+import time
+import tkinter as tk
+from collections import OrderedDict
+from PIL import ImageTk
+from thumbnailer import SKIPPED
+
+
+class GridLayout:
+    """Geometry of the thumbnail grid in canvas coordinates.
+
+    Every cell has the same size, so positions and hit tests are plain
+    arithmetic and never need to ask Tk about widgets.
+    """
+
+    def __init__(self, columns=6, thumbnail_size=(100, 100), margin=10, padding=5, label_height=20):
+        self.columns = columns
+        self.thumbnail_size = thumbnail_size
+        self.margin = margin    # Space around each cell (like the old grid padx/pady)
+        self.padding = padding  # Space between the cell border and its thumbnail
+        self.cell_width = thumbnail_size[0] + 2 * (margin + padding)
+        self.cell_height = thumbnail_size[1] + label_height + 2 * (margin + padding)
+
+    def rows(self, count):
+        return (count + self.columns - 1) // self.columns
+
+    def size(self, count):
+        return self.columns * self.cell_width, self.rows(count) * self.cell_height
+
+    def cell_box(self, index):
+        """(x1, y1, x2, y2) of the highlightable area of a cell."""
+        row, column = divmod(index, self.columns)
+        x1 = column * self.cell_width + self.margin
+        y1 = row * self.cell_height + self.margin
+        return x1, y1, x1 + self.cell_width - 2 * self.margin, y1 + self.cell_height - 2 * self.margin
+
+    def index_at(self, x, y, count):
+        """Index of the cell containing canvas point (x, y), or None."""
+        if x < 0 or y < 0:
+            return None
+        column = int(x // self.cell_width)
+        index = int(y // self.cell_height) * self.columns + column
+        if column >= self.columns or index >= count:
+            return None
+        x1, y1, x2, y2 = self.cell_box(index)
+        if x1 <= x <= x2 and y1 <= y <= y2:
+            return index
+        return None
+
+    def visible_range(self, top, bottom, count, overscan_rows=0):
+        """Indices [first, last) of the cells in rows overlapping canvas y range [top, bottom]."""
+        first_row = max(0, int(top // self.cell_height) - overscan_rows)
+        last_row = int(bottom // self.cell_height) + 1 + overscan_rows
+        return min(count, first_row * self.columns), min(count, last_row * self.columns)
+
+
+class _Cell:
+    # Canvas items of one on-screen cell; recycled as the view scrolls
+    def __init__(self, canvas, placeholder):
+        self.background = canvas.create_rectangle(0, 0, 0, 0, fill="white", outline="", state="hidden")
+        self.image = canvas.create_image(0, 0, image=placeholder, anchor="n", state="hidden")
+        self.label = canvas.create_text(0, 0, text="", anchor="n", state="hidden")
+        self.index = None
+
+
+class VirtualGallery:
+    """Thumbnail grid on a canvas that only materializes the rows near the viewport.
+
+    A fixed pool of canvas items is reused while scrolling, and thumbnails are
+    requested from the loader only when their row comes into view, so the cost
+    of the grid depends on the window size rather than the number of images.
+    on_loaded() is called whenever a request for thumbnails has completed,
+    e.g. to persist the thumbnail cache. After set_images, the time to the
+    first thumbnail and to a completely drawn view is printed.
+    """
+
+    def __init__(self, canvas, loader, layout=None, overscan_rows=2, max_photos=1000, on_loaded=None):
+        self.canvas = canvas
+        self.loader = loader
+        self.on_loaded = on_loaded
+        self.layout = layout or GridLayout()
+        self.overscan_rows = overscan_rows
+        self.max_photos = max_photos
+        self.paths = []
+        self.colors = {}              # index -> background color of highlighted cells
+        self.photos = OrderedDict()   # index -> PhotoImage, least recently shown first
+        self.requested = set()        # Indices whose thumbnails are being decoded
+        self.requests = []            # ThumbnailRequests of this gallery that may still deliver
+        self.failed = set()           # Indices that could not be decoded
+        self.cells = {}               # index -> _Cell currently showing it
+        self.free_cells = []
+        self.range = (0, 0)
+        self.fill_start = None        # perf_counter() of the last set_images, until its first view is drawn
+        self.first_thumbnail = None   # Seconds from set_images to the first thumbnail
+        self.placeholder = tk.PhotoImage(width=self.layout.thumbnail_size[0], height=self.layout.thumbnail_size[1])
+
+    def _cancel_requests(self):
+        # Only this gallery's requests; other users of the loader keep theirs
+        for request in self.requests:
+            request.cancel()
+        self.requests = []
+
+    def set_images(self, paths):
+        """Show a new list of images, discarding the previous one."""
+        self._cancel_requests()
+        self.paths = list(paths)
+        self.colors.clear()
+        self.photos.clear()
+        self.requested.clear()
+        self.failed.clear()
+        for cell in self.cells.values():
+            self._hide(cell)
+        self.cells.clear()
+        self.range = (0, 0)
+        self.fill_start = time.perf_counter() if self.paths else None
+        self.first_thumbnail = None
+
+        self._update_scrollregion()
+        self.canvas.yview_moveto(0)
+        self.refresh()
+
+    def add_images(self, paths):
+        """Append images to the end of the grid; the cells already shown are not touched."""
+        self.paths.extend(paths)
+        self._update_scrollregion()
+        self.refresh()
+
+    def remove_images(self, paths):
+        """Remove images from the grid and return their former indices, in ascending order.
+
+        The images after the first removed one move up, so only the cells
+        from there on are redrawn. Thumbnails still being decoded are
+        requested again, as their indices are no longer valid.
+        """
+        positions = {path: index for index, path in enumerate(self.paths)}
+        removed = sorted(positions[path] for path in set(paths) if path in positions)
+        if not removed:
+            return removed
+
+        # Old index -> new index of every image that stays
+        removed_set = set(removed)
+        mapping = {}
+        for index in range(len(self.paths)):
+            if index not in removed_set:
+                mapping[index] = len(mapping)
+        self.paths = [path for index, path in enumerate(self.paths) if index not in removed_set]
+        self.colors = {mapping[index]: color for index, color in self.colors.items() if index in mapping}
+        self.photos = OrderedDict((mapping[index], photo) for index, photo in self.photos.items() if index in mapping)
+        self.failed = {mapping[index] for index in self.failed if index in mapping}
+        self._cancel_requests()
+        self.requested.clear()
+
+        for index in [index for index in self.cells if index >= removed[0]]:
+            self._hide(self.cells.pop(index))
+        self.range = (0, 0)
+        self._update_scrollregion()
+        self.refresh()
+        return removed
+
+    def update_images(self, paths):
+        """Decode the thumbnails of images whose files changed again."""
+        positions = {path: index for index, path in enumerate(self.paths)}
+        for path in paths:
+            index = positions.get(path)
+            if index is None:
+                continue
+            self.photos.pop(index, None)
+            self.failed.discard(index)
+            cell = self.cells.get(index)
+            if cell is not None:
+                self.canvas.itemconfigure(cell.image, image=self.placeholder)
+        self._request_missing()
+
+    def _update_scrollregion(self):
+        width, height = self.layout.size(len(self.paths))
+        self.canvas.configure(scrollregion=(0, 0, width, height))
+
+    def __len__(self):
+        return len(self.paths)
+
+    def refresh(self):
+        """Bring the materialized cells in line with the current viewport."""
+        top = self.canvas.canvasy(0)
+        bottom = top + self.canvas.winfo_height()
+        first, last = self.layout.visible_range(top, bottom, len(self.paths), self.overscan_rows)
+        if (first, last) == self.range:
+            return
+        self.range = (first, last)
+
+        for index in [index for index in self.cells if not first <= index < last]:
+            self._hide(self.cells.pop(index))
+
+        for index in range(first, last):
+            if index not in self.cells:
+                self._show(index)
+        self._request_missing()
+
+    def _request_missing(self):
+        # Ask the loader for the thumbnails of materialized cells that have none yet
+        missing = [(index, self.paths[index]) for index in self.cells
+                   if index not in self.photos and index not in self.requested and index not in self.failed]
+        if missing:
+            self.requested.update(index for index, _ in missing)
+            self.requests = [request for request in self.requests if request.remaining]
+            self.requests.append(self.loader.request(missing, self._on_thumbnails, self.on_loaded,
+                                                     size=self.layout.thumbnail_size, still_wanted=self._is_wanted))
+
+    def _is_wanted(self, index):
+        # Called from loader threads; reading the tuple is atomic
+        first, last = self.range
+        return first <= index < last
+
+    def _show(self, index):
+        cell = self.free_cells.pop() if self.free_cells else _Cell(self.canvas, self.placeholder)
+        cell.index = index
+        self.cells[index] = cell
+
+        x1, y1, x2, y2 = self.layout.cell_box(index)
+        center_x = (x1 + x2) / 2
+        padding = self.layout.padding
+        photo = self.photos.get(index)
+        if photo is not None:
+            self.photos.move_to_end(index)
+
+        name = os.path.basename(self.paths[index]) or str(index + 1)
+        if len(name) > 18:
+            name = name[:15] + "..."
+
+        self.canvas.coords(cell.background, x1, y1, x2, y2)
+        self.canvas.itemconfigure(cell.background, fill=self.colors.get(index, "white"), state="normal")
+        self.canvas.coords(cell.image, center_x, y1 + padding)
+        self.canvas.itemconfigure(cell.image, image=photo if photo is not None else self.placeholder, state="normal")
+        self.canvas.coords(cell.label, center_x, y1 + padding + self.layout.thumbnail_size[1])
+        self.canvas.itemconfigure(cell.label, text=name, state="normal")
+
+    def _hide(self, cell):
+        for item in (cell.background, cell.image, cell.label):
+            self.canvas.itemconfigure(item, state="hidden")
+        cell.index = None
+        self.free_cells.append(cell)
+
+    def _on_thumbnails(self, batch):
+        for index, img in batch:
+            self.requested.discard(index)
+            if img is SKIPPED:
+                continue  # It had scrolled away; requested again if it comes back into view
+            if img is None:
+                self.failed.add(index)
+                continue
+            photo = ImageTk.PhotoImage(img)
+            self.photos[index] = photo
+            cell = self.cells.get(index)
+            if cell is not None:
+                self.canvas.itemconfigure(cell.image, image=photo)
+
+        # Drop the least recently shown thumbnails that are off screen
+        while len(self.photos) > self.max_photos:
+            index = next(iter(self.photos))
+            if index in self.cells:
+                break
+            del self.photos[index]
+
+        if self.fill_start is not None:
+            self._report_fill()
+
+        # Rows that scrolled back into view while their decode was skipped
+        self._request_missing()
+
+    def _report_fill(self):
+        elapsed = time.perf_counter() - self.fill_start
+        if self.first_thumbnail is None and self.photos:
+            self.first_thumbnail = elapsed
+        if all(index in self.photos or index in self.failed for index in self.cells):
+            first = self.first_thumbnail if self.first_thumbnail is not None else elapsed
+            print(f"Loaded the {len(self.cells)} thumbnails in view: first after {first * 1000:.0f} ms, all after {elapsed:.2f} s")
+            self.fill_start = None
+
+    def set_color(self, index, color):
+        """Set the background color of a cell; "white" removes the highlight."""
+        if color == "white":
+            self.colors.pop(index, None)
+        else:
+            self.colors[index] = color
+        cell = self.cells.get(index)
+        if cell is not None:
+            self.canvas.itemconfigure(cell.background, fill=color)
+
+    def index_at(self, x, y):
+        """Index of the thumbnail under canvas widget coordinates (x, y), or None."""
+        return self.layout.index_at(self.canvas.canvasx(x), self.canvas.canvasy(y), len(self.paths))
+
+
+class HighlightController:
+    """Hover and selection highlighting that only updates the cells whose state changed.
+
+    hover() may be called several times per camera frame (for every hand,
+    from both the hover gesture and the cursor); the calls are merged and
+    only the last one is applied, once, when Tk is idle. A change of hover or
+    selection touches at most the two cells involved.
+    """
+
+    HOVER_COLOR = "lightblue"
+    SELECTED_COLOR = "green"
+
+    def __init__(self, gallery, root):
+        self.gallery = gallery
+        self.root = root
+        self.hovered = None
+        self.selected = None
+        self.pending_hover = None
+        self.scheduled = False
+
+    def hover(self, index):
+        self.pending_hover = index
+        if not self.scheduled:
+            self.scheduled = True
+            self.root.after_idle(self._apply_hover)
+
+    def _apply_hover(self):
+        self.scheduled = False
+        if self.pending_hover != self.hovered:
+            previous, self.hovered = self.hovered, self.pending_hover
+            self._repaint(previous, self.hovered)
+
+    def select(self, index):
+        if index != self.selected:
+            previous, self.selected = self.selected, index
+            self._repaint(previous, index)
+
+    def reset(self):
+        """Forget hover and selection, e.g. after the gallery was given new images."""
+        self.hovered = self.selected = self.pending_hover = None
+
+    def remap(self, removed):
+        """Follow the images that moved up after gallery.remove_images returned removed."""
+        def shifted(index):
+            if index is None or index in removed:
+                return None
+            return index - sum(1 for r in removed if r < index)
+        self.hovered = shifted(self.hovered)
+        self.selected = shifted(self.selected)
+        self.pending_hover = shifted(self.pending_hover)
+
+    def _color(self, index):
+        if index == self.selected:
+            return self.SELECTED_COLOR
+        if index == self.hovered:
+            return self.HOVER_COLOR
+        return "white"
+
+    def _repaint(self, *indices):
+        for index in indices:
+            if index is not None and index < len(self.gallery):
+                color = self._color(index)
+                if self.gallery.colors.get(index, "white") != color:
+                    self.gallery.set_color(index, color)
+
+
+class ThumbnailIndex:
+    """Thumbnail boxes in root-window coordinates with O(1) point lookup.
+
+    The only Tk round-trips are for the canvas position, size and scroll
+    offset. They are cached until invalidate() is called on <Configure>,
+    scroll or reload, so a hit test per camera frame is pure arithmetic. It
+    also works as a read-only sequence of (x1, y1, x2, y2) boxes.
+    """
+
+    def __init__(self, gallery, root):
+        self.gallery = gallery
+        self.root = root
+        self.valid = False
+        self.offset_x = 0
+        self.offset_y = 0
+        self.view = (0, 0, 0, 0)  # Visible canvas area in root coordinates
+
+    def invalidate(self):
+        self.valid = False
+
+    def _update(self):
+        canvas = self.gallery.canvas
+        left = canvas.winfo_rootx() - self.root.winfo_rootx()
+        top = canvas.winfo_rooty() - self.root.winfo_rooty()
+        self.view = (left, top, left + canvas.winfo_width(), top + canvas.winfo_height())
+        self.offset_x = left - canvas.canvasx(0)
+        self.offset_y = top - canvas.canvasy(0)
+        self.valid = True
+
+    def index_at(self, x, y):
+        """Index of the thumbnail at root coordinates (x, y), or None."""
+        if not self.valid:
+            self._update()
+        left, top, right, bottom = self.view
+        if not (left <= x < right and top <= y < bottom):
+            return None  # Outside the canvas; cells scrolled out of view cannot be hit
+        return self.gallery.layout.index_at(x - self.offset_x, y - self.offset_y, len(self.gallery))
+
+    def __len__(self):
+        return len(self.gallery)
+
+    def __getitem__(self, index):
+        if not 0 <= index < len(self.gallery):
+            raise IndexError(index)
+        if not self.valid:
+            self._update()
+        x1, y1, x2, y2 = self.gallery.layout.cell_box(index)
+        return x1 + self.offset_x, y1 + self.offset_y, x2 + self.offset_x, y2 + self.offset_y
@@ -0,0 +1,168 @@
+import argparse
+import numpy as np
+import gestures
+from landmarks import to_pixels
+from recording import load_recording
+
+GESTURES = ("click", "scroll", "zoom")  # Classes the gesture engine acts on; any other label means "no gesture"
+NO_GESTURE = "none"
+
+# Landmark pairs whose distances are features: thumb tip to every other fingertip, neighboring
+# fingertips, and the thumb tip to the ring finger pip used by the scroll and zoom rules
+FEATURE_PAIRS = np.array([(4, 8), (4, 12), (4, 16), (4, 20), (8, 12), (12, 16), (16, 20), (4, 14), (8, 5), (12, 9)])
+
+
+def hand_features(points):
+    """Feature vectors of a batch of hands; points is a (hands, 21, 2) array of pixel landmarks.
+
+    Landmarks are taken relative to the wrist and every length is divided
+    by the palm size (wrist to middle finger knuckle), so the features do
+    not depend on how far the hand is from the camera or how big it is.
+    """
+    points = np.asarray(points, dtype=np.float32)[..., :2]
+    palm = np.linalg.norm(points[:, 9] - points[:, 0], axis=1)
+    palm = np.maximum(palm, 1e-6)[:, np.newaxis]
+
+    relative = (points - points[:, :1]).reshape(len(points), points.shape[1] * 2) / palm
+    differences = points[:, FEATURE_PAIRS[:, 0]] - points[:, FEATURE_PAIRS[:, 1]]
+    distances = np.hypot(differences[..., 0], differences[..., 1]) / palm
+    return np.concatenate([relative, distances], axis=1)
+
+
+class GestureClassifier:
+    """Nearest-centroid gesture classifier on standardized hand features.
+
+    Every label has a centroid and a rejection radius: a hand is assigned to
+    the nearest centroid only when it lies within that label's radius,
+    otherwise it is NO_GESTURE. Everything is evaluated for all hands at
+    once with NumPy.
+    """
+
+    def __init__(self, labels, centroids, mean, scale, radii):
+        self.labels = np.asarray(labels)
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.scale = np.asarray(scale, dtype=np.float32)
+        self.radii = np.asarray(radii, dtype=np.float32)
+
+    @classmethod
+    def fit(cls, features, labels, radius_percentile=95):
+        """Fit from an (n, features) array and n labels; the radius of a label covers radius_percentile % of its samples."""
+        labels = np.asarray(labels)
+        mean = features.mean(axis=0)
+        scale = np.maximum(features.std(axis=0), 1e-6)
+        standardized = (features - mean) / scale
+
+        names = np.unique(labels)
+        centroids = np.stack([standardized[labels == name].mean(axis=0) for name in names])
+        radii = np.array([
+            np.percentile(np.linalg.norm(standardized[labels == name] - centroid, axis=1), radius_percentile)
+            for name, centroid in zip(names, centroids)
+        ])
+        return cls(names, centroids, mean, scale, radii)
+
+    def distances(self, features):
+        """(hands, labels) distances of every hand to every centroid, in standardized units."""
+        standardized = (features - self.mean) / self.scale
+        differences = standardized[:, np.newaxis, :] - self.centroids[np.newaxis, :, :]
+        return np.linalg.norm(differences, axis=2)
+
+    def predict(self, features):
+        """Label of every hand, NO_GESTURE where no centroid is close enough."""
+        distances = self.distances(features)
+        nearest = distances.argmin(axis=1)
+        accepted = distances[np.arange(len(features)), nearest] <= self.radii[nearest]
+        return np.where(accepted, self.labels[nearest], NO_GESTURE)
+
+    def conditions(self, points, names=GESTURES, hold_factor=1.5):
+        """Entry and hold conditions for the gesture engine, in the layout of gestures.evaluate_hands.
+
+        A gesture is entered when its centroid is the nearest one and within
+        its radius, and held while the hand stays within hold_factor times
+        that radius, which gives the state machines their hysteresis.
+        Returns (entered, held), each a tuple with one boolean array per name.
+        """
+        distances = self.distances(hand_features(points))
+        nearest = distances.argmin(axis=1) if len(points) else np.zeros(0, dtype=int)
+        entered, held = [], []
+        for name in names:
+            column = np.flatnonzero(self.labels == name)
+            if not len(column):
+                entered.append(np.zeros(len(points), dtype=bool))
+                held.append(np.zeros(len(points), dtype=bool))
+                continue
+            column = column[0]
+            entered.append((nearest == column) & (distances[:, column] <= self.radii[column]))
+            held.append(distances[:, column] <= hold_factor * self.radii[column])
+        return tuple(entered), tuple(held)
+
+    def save(self, path):
+        # Through a file object, as np.savez would add ".npz" to a path without it
+        with open(path, "wb") as f:
+            np.savez(f, labels=self.labels.astype(str), centroids=self.centroids, mean=self.mean, scale=self.scale, radii=self.radii)
+
+
+def load_classifier(path):
+    with np.load(path, allow_pickle=False) as data:
+        return GestureClassifier(data["labels"], data["centroids"], data["mean"], data["scale"], data["radii"])
+
+
+def rule_predictions(points):
+    """Labels the hand-tuned rules in gestures.py give a batch of hands, with the old click > scroll > zoom priority."""
+    click, scroll, zoom = gestures.evaluate_hands(points)
+    return np.where(click, "click", np.where(scroll, "scroll", np.where(zoom, "zoom", NO_GESTURE)))
+
+
+def load_sessions(sessions):
+    """Pixel landmarks and labels of labeled recordings given as "label=path" strings.
+
+    A session is a recording made with the app's --record option while one
+    gesture (or, for "none", no gesture) was performed the whole time.
+    """
+    points, labels = [], []
+    for session in sessions:
+        label, _, path = session.partition("=")
+        if not path:
+            raise ValueError(f'Expected "label=recording.npz", got "{session}"')
+        recording = load_recording(path)
+        session_points = to_pixels(recording.points, *recording.frame_size)
+        points.append(session_points)
+        labels.extend([label] * len(session_points))
+    return np.concatenate(points), np.array(labels)
+
+
+def print_evaluation(title, labels, predicted):
+    names = sorted(set(labels) | set(predicted))
+    print(f"{title}: accuracy {np.mean(labels == predicted) * 100:.1f}% on {len(labels)} hands")
+    print("  " + "true \\ predicted".ljust(18) + "".join(f"{name[:8]:>9}" for name in names))
+    for name in names:
+        row = predicted[labels == name]
+        print("  " + name[:18].ljust(18) + "".join(f"{np.sum(row == other):>9}" for other in names))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit or evaluate the data-driven gesture classifier from labeled landmark recordings")
+    commands = parser.add_subparsers(dest="command", required=True)
+    calibrate = commands.add_parser("calibrate", help="Fit a classifier and save it")
+    calibrate.add_argument("model", help=".npz file to write the classifier to")
+    calibrate.add_argument("sessions", nargs="+", metavar="LABEL=RECORDING", help='e.g. click=click.npz scroll=scroll.npz none=idle.npz')
+    calibrate.add_argument("--radius-percentile", type=float, default=95, help="Share of each label's samples inside its rejection radius")
+    evaluate = commands.add_parser("evaluate", help="Compare a classifier and the hand-tuned rules on labeled recordings")
+    evaluate.add_argument("model", help="Classifier written by calibrate")
+    evaluate.add_argument("sessions", nargs="+", metavar="LABEL=RECORDING")
+    args = parser.parse_args()
+
+    points, labels = load_sessions(args.sessions)
+    if args.command == "calibrate":
+        classifier = GestureClassifier.fit(hand_features(points), labels, args.radius_percentile)
+        classifier.save(args.model)
+        print(f"Fitted {len(classifier.labels)} labels on {len(labels)} hands, saved to {args.model}")
+        print_evaluation("Training set", labels, classifier.predict(hand_features(points)))
+    else:
+        classifier = load_classifier(args.model)
+        print_evaluation("Classifier", labels, classifier.predict(hand_features(points)))
+        print_evaluation("Rules", labels, rule_predictions(points))
+
+
+if __name__ == "__main__":
+    main()
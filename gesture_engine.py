@@ -0,0 +1,250 @@
+from collections import namedtuple
+import numpy as np
+import gestures
+from landmarks import HandLandmarks, to_pixels
+
+IDLE = "idle"
+ARMED = "armed"
+ACTIVE = "active"
+RELEASED = "released"
+
+# phase is "start", "update" or "end"; value is the scroll or zoom step of an update
+# (None when the hand has not moved a full step yet); time is the frame time passed to process()
+GestureEvent = namedtuple("GestureEvent", "gesture phase value time")
+
+
+class GestureState:
+    """State machine of one gesture: idle -> armed -> active -> released -> idle.
+
+    A gesture is armed when its entry condition holds and becomes active once
+    it has held for arm_frames frames in a row. It stays active while a looser
+    hold condition is true (hysteresis), so jitter around the entry threshold
+    does not restart it, and ends after release_frames frames without it.
+    """
+
+    def __init__(self, name, continuous, arm_frames=2, release_frames=2):
+        self.name = name
+        self.continuous = continuous  # Streams updates while active, instead of only firing on entry
+        self.arm_frames = arm_frames
+        self.release_frames = release_frames
+        self.state = IDLE
+        self.frames = 0  # Consecutive frames spent arming or releasing
+
+    def step(self, entered, held):
+        """Advance one frame; return "start", "end" or None."""
+        if self.state == IDLE or self.state == ARMED:
+            if not entered:
+                self.state = IDLE
+                return None
+            self.frames = self.frames + 1 if self.state == ARMED else 1
+            self.state = ARMED
+            if self.frames >= self.arm_frames:
+                self.state = ACTIVE
+                return "start"
+            return None
+
+        if held:
+            self.state = ACTIVE  # A short dropout during release does not end the gesture
+            return None
+        self.frames = self.frames + 1 if self.state == RELEASED else 1
+        self.state = RELEASED
+        if self.frames >= self.release_frames:
+            self.state = IDLE
+            return "end"
+        return None
+
+
+class GestureEngine:
+    """Turns one hand's landmarks per frame into gesture events.
+
+    This is the decision logic of GestureDetection.update_frame without any
+    camera, drawing or Tk calls, so it can also run over recorded landmarks.
+    Time is passed in by the caller instead of being read from the clock.
+    Landmarks may be a HandLandmarks or a (21, 2) pixel array, which is
+    loaded into the engine's own HandLandmarks so every rule shares one
+    distance matrix per frame.
+
+    Each gesture has its own GestureState. Click is discrete and acts once,
+    on its start event. Scroll and zoom are continuous: while active they emit
+    an update every frame, whose value is the direction of a completed
+    scroll or zoom step or None. Only one gesture can be in progress at a
+    time; when several start on the same frame, click wins over scroll and
+    scroll over zoom, like the old if/elif chain.
+    """
+
+    # Hold thresholds are looser than the entry thresholds in gestures.py
+    CLICK_HOLD = 28
+    SCROLL_HOLD = {"align_threshold": 30, "ring_thumb_threshold": 62}
+    ZOOM_HOLD = {"thumb_ring_range": (40, 115), "index_middle_threshold": 25}
+    SCROLL_RESET = 40  # Mixed movement (px) after which the scroll reference point is moved along
+    SCROLL_STEP = (20, 5)  # Movement (px) that makes a scroll step, and the side movement it tolerates
+    ZOOM_STEP = 10         # Change of the thumb-to-fingers distance (px) that makes a zoom step
+    REFERENCE_PALM = 80    # Palm size (px, wrist to middle finger knuckle) the pixel steps above are meant for
+
+    def __init__(self, arm_frames=2, release_frames=2):
+        self.click = GestureState("click", False, arm_frames, release_frames)
+        self.scroll = GestureState("scroll", True, arm_frames, release_frames)
+        self.zoom = GestureState("zoom", True, arm_frames, release_frames)
+        self.states = (self.click, self.scroll, self.zoom)
+        self.scroll_anchor = None  # Index fingertip position of the last scroll step
+        self.zoom_anchor = None    # Thumb-to-fingers distance of the last zoom step
+        self.step_scale = 1.0      # Factor applied to the pixel steps in this frame
+        self.landmarks = HandLandmarks()  # Reused every frame; its distance matrix is computed once per frame
+
+    def process(self, landmarks, now, conditions=None, step_scale=1.0):
+        """Return the list of GestureEvents produced by this frame.
+
+        conditions are the (entered, held) pairs of click, scroll and zoom when
+        they were already evaluated for a batch of hands (see MultiHandGestureEngine).
+        step_scale multiplies the scroll and zoom step sizes, e.g. to follow
+        the size of the hand in the frame.
+        """
+        self.step_scale = step_scale
+        if landmarks is not None and not isinstance(landmarks, HandLandmarks):
+            self.landmarks.set_pixels(landmarks)
+            landmarks = self.landmarks
+        if conditions is None:
+            conditions = (
+                (gestures.is_click_gesture(landmarks), gestures.is_click_gesture(landmarks, self.CLICK_HOLD)),
+                (gestures.is_scroll_gesture(landmarks), gestures.is_scroll_gesture(landmarks, **self.SCROLL_HOLD)),
+                (gestures.is_zoom_detected(landmarks), gestures.is_zoom_detected(landmarks, **self.ZOOM_HOLD)),
+            )
+        busy = next((state for state in self.states if state.state != IDLE), None)
+
+        events = []
+        for state, (entered, held) in zip(self.states, conditions):
+            phase = state.step(entered and (busy is None or busy is state), held)
+            if phase == "start":
+                busy = state
+                self._begin(state, landmarks)
+                events.append(GestureEvent(state.name, "start", None, now))
+            if state.continuous and state.state == ACTIVE:
+                events.append(GestureEvent(state.name, "update", self._update(state, landmarks), now))
+            if phase == "end":
+                events.append(GestureEvent(state.name, "end", None, now))
+        return events
+
+    def _begin(self, state, landmarks):
+        if state is self.scroll:
+            _, x, y = gestures.detect_scroll_direction(landmarks, None, None)
+            self.scroll_anchor = (x, y)
+        elif state is self.zoom:
+            _, self.zoom_anchor = gestures.detect_zoom_direction(landmarks, None)
+
+    def _update(self, state, landmarks):
+        # Steps are measured from the position of the previous step, so slow movements add up
+        scale = self.step_scale
+        if state is self.scroll:
+            anchor_x, anchor_y = self.scroll_anchor
+            major, minor = self.SCROLL_STEP
+            direction, x, y = gestures.detect_scroll_direction(landmarks, anchor_x, anchor_y, major * scale, minor * scale)
+            if direction != "none" or max(abs(x - anchor_x), abs(y - anchor_y)) > self.SCROLL_RESET * scale:
+                self.scroll_anchor = (x, y)
+            return None if direction == "none" else direction
+
+        zoom_direction, distance = gestures.detect_zoom_direction(landmarks, self.zoom_anchor, self.ZOOM_STEP * scale)
+        if zoom_direction == "":
+            return None
+        self.zoom_anchor = distance
+        return zoom_direction
+
+    def release(self, now):
+        """Advance a frame in which the hand was not seen; return the end events this produces."""
+        return self.process(None, now, ((False, False),) * 3)
+
+    def is_idle(self):
+        return all(state.state == IDLE for state in self.states)
+
+
+class MultiHandGestureEngine:
+    """Gesture events for every detected hand, with the rules evaluated over all hands at once.
+
+    The hands of a frame are stacked into one (hands, 21, 2) array and
+    gestures.evaluate_hands computes the entry and hold conditions of every
+    gesture for all of them in a single vectorized pass. Each hand keeps its
+    own GestureEngine; detections are matched to the hands of the previous
+    frame by wrist position, because MediaPipe does not keep hands in a fixed
+    order. process() returns (hand, event) pairs, where hand is that stable id.
+
+    With a classifier (see gesture_classifier.py), its conditions replace the
+    hand-tuned pixel thresholds of gestures.py, and the scroll and zoom steps
+    are scaled by the palm size of each hand, so that like the classifier
+    they do not depend on how far the hand is from the camera.
+    """
+
+    def __init__(self, engine_factory=GestureEngine, max_match_distance=120, classifier=None):
+        self.engine_factory = engine_factory
+        self.classifier = classifier
+        self.max_match_distance = max_match_distance  # Wrist movement (px) beyond which a detection is a new hand
+        self.engines = {}  # hand id -> GestureEngine
+        self.wrists = {}   # hand id -> wrist position in the previous frame
+        self.ids = []      # Hand id of each row of the last processed frame
+        self.points = np.zeros((0, 21, 2), dtype=np.float32)
+
+    def process(self, hands, frame_size, now):
+        """Run the gesture engines on one frame of normalized (hands, 21, 2) landmarks."""
+        if self.points.shape[0] != len(hands):
+            self.points = np.empty((len(hands), 21, 2), dtype=np.float32)
+        points = to_pixels(hands, frame_size[0], frame_size[1], out=self.points)
+        ids = self.ids = self._match(points)
+
+        if self.classifier is not None:
+            entered, held = self.classifier.conditions(points)
+            palms = np.linalg.norm(points[:, 9] - points[:, 0], axis=1)
+            step_scales = np.maximum(palms, 1.0) / GestureEngine.REFERENCE_PALM
+        else:
+            entered = gestures.evaluate_hands(points)
+            held = gestures.evaluate_hands(points, click_threshold=GestureEngine.CLICK_HOLD, **GestureEngine.SCROLL_HOLD, **GestureEngine.ZOOM_HOLD)
+            step_scales = np.ones(len(points))
+
+        events = []
+        for row, hand_id in enumerate(ids):
+            engine = self.engines.get(hand_id)
+            if engine is None:
+                engine = self.engines[hand_id] = self.engine_factory()
+            conditions = tuple((bool(entered[g][row]), bool(held[g][row])) for g in range(3))
+            events.extend((hand_id, event) for event in engine.process(points[row], now, conditions, float(step_scales[row])))
+
+        # Hands that were not seen release their gestures and are forgotten once idle
+        for hand_id in [hand_id for hand_id in self.engines if hand_id not in ids]:
+            engine = self.engines[hand_id]
+            events.extend((hand_id, event) for event in engine.release(now))
+            if engine.is_idle():
+                del self.engines[hand_id]
+                self.wrists.pop(hand_id, None)
+        return events
+
+    def _match(self, points):
+        # Greedy nearest-wrist matching of detections to the hands of the previous frame
+        ids = [None] * len(points)
+        known = list(self.wrists)
+        if known and len(points):
+            previous = np.array([self.wrists[hand_id] for hand_id in known], dtype=np.float32)
+            cost = np.linalg.norm(points[:, np.newaxis, 0] - previous[np.newaxis], axis=2)
+            for flat in np.argsort(cost, axis=None):
+                row, column = divmod(int(flat), len(known))
+                if cost[row, column] > self.max_match_distance:
+                    break
+                if ids[row] is None and known[column] is not None:
+                    ids[row] = known[column]
+                    known[column] = None
+        taken = set(ids) | set(self.engines)
+        next_id = 0
+        for row in range(len(ids)):
+            if ids[row] is None:
+                while next_id in taken:
+                    next_id += 1
+                ids[row] = next_id
+                taken.add(next_id)
+            self.wrists[ids[row]] = points[row, 0].copy()
+        return ids
+
+
+def event_name(event):
+    """Flat name of a gesture event, e.g. "click:start", "scroll:up" or "zoom:end".
+
+    Updates without a completed step have no name and are not worth recording.
+    """
+    if event.phase == "update":
+        return None if event.value is None else f"{event.gesture}:{event.value}"
+    return f"{event.gesture}:{event.phase}"
@@ -1,17 +1,30 @@
+import numpy as np
 import utils
 
-def is_zoom_detected(landmarks):
-    # Draw the filled green circle for the index finger tip (after drawing connections)
-    index_tip = landmarks[8]  # Index finger tip
-    middle_tip =landmarks[12] # middle finger tip
-    thumb_tip = landmarks[4]
-    ring_pip = landmarks[14]
+# Entry thresholds in pixels, shared by the per-hand rules and evaluate_hands
+CLICK_THRESHOLD = 20  # Thumb tip to index tip
+ALIGN_THRESHOLD = 20  # Horizontal offset of the index and middle tips while scrolling
+RING_THUMB_THRESHOLD = 50  # Thumb tip to ring pip while scrolling
+THUMB_RING_RANGE = (50, 100)  # Thumb tip to ring pip while zooming
+INDEX_MIDDLE_THRESHOLD = 18  # Index tip to middle tip while zooming
+
+# Landmark pairs measured by the batched rules: thumb-index tips, middle-index tips, thumb tip-ring pip
+_BATCH_PAIRS = np.array([(4, 8), (12, 8), (4, 14)])
 
-    index_middle_distance = utils.calculate_distance(middle_tip,index_tip)
-    thumb_ring_distance = utils.calculate_distance(thumb_tip,ring_pip)
+def _distance(landmarks, a, b):
+    # HandLandmarks computes every pairwise distance once per frame; plain lists fall back to utils
+    if hasattr(landmarks, "distance"):
+        return landmarks.distance(a, b)
+    return utils.calculate_distance(landmarks[a], landmarks[b])
 
+def is_zoom_detected(landmarks, thumb_ring_range=THUMB_RING_RANGE, index_middle_threshold=INDEX_MIDDLE_THRESHOLD):
+    # Draw the filled green circle for the index finger tip (after drawing connections)
+    # Index finger tip (8), middle finger tip (12), thumb tip (4), ring finger pip (14)
+    index_middle_distance = _distance(landmarks, 12, 8)
+    thumb_ring_distance = _distance(landmarks, 4, 14)
 
-    if (50 < thumb_ring_distance < 100) and (index_middle_distance < 18):
+
+    if (thumb_ring_range[0] < thumb_ring_distance < thumb_ring_range[1]) and (index_middle_distance < index_middle_threshold):
         return True
     return False
 
@@ -20,50 +33,49 @@ def is_hover_gesture(landmarks, element_positions):
     """
     Detect if the index fingertip is hovering over any UI element.
     :param landmarks: List of hand landmark positions.
-    :param element_positions: List of bounding box positions [(x1, y1, x2, y2), ...].
+    :param element_positions: List of bounding box positions [(x1, y1, x2, y2), ...],
+        or a spatial index with an index_at(x, y) method.
     :return: Index of the hovered element or -1 if no hover is detected.
     """
     index_tip = landmarks[8]  # Index fingertip position (x, y)
 
+    if hasattr(element_positions, "index_at"):
+        idx = element_positions.index_at(index_tip[0], index_tip[1])
+        return -1 if idx is None else idx
+
     for idx, (x1, y1, x2, y2) in enumerate(element_positions):
         if x1 <= index_tip[0] <= x2 and y1 <= index_tip[1] <= y2:
             return idx  # Return the index of the hovered element
 
     return -1  # No hover detected
 
-def detect_zoom_direction(landmarks,previous_distance):
-    index_tip = landmarks[8]  # Index finger tip
-    thumb_tip = landmarks[4]  # Thumb tip
-    middle_tip =landmarks[12]
-
+def detect_zoom_direction(landmarks,previous_distance, threshold=10):
     result=""
 
-    # Calculate the distances
-    thumb_index_distance = utils.calculate_distance(thumb_tip, index_tip)
-    thumb_middle_distance = utils.calculate_distance(thumb_tip, middle_tip)
+    # Calculate the distances from the thumb tip (4) to the index (8) and middle (12) finger tips
+    thumb_index_distance = _distance(landmarks, 4, 8)
+    thumb_middle_distance = _distance(landmarks, 4, 12)
     
     # Calculate the average distance for zooming
     average_distance = (thumb_index_distance + thumb_middle_distance) / 2
     # Determine zoom gesture
     if previous_distance is not None:
-        if average_distance < previous_distance - 10:  # Zoom in
+        if average_distance < previous_distance - threshold:  # Zoom in
             result = "out"
-        elif average_distance > previous_distance + 10:  # Zoom out
+        elif average_distance > previous_distance + threshold:  # Zoom out
             result = "in"
 
     previous_distance = average_distance
     return result,previous_distance
 
 
-def is_scroll_gesture(landmarks):
+def is_scroll_gesture(landmarks, align_threshold=ALIGN_THRESHOLD, ring_thumb_threshold=RING_THUMB_THRESHOLD):
     """Detects scrolling when index (8) and middle finger (12) are aligned."""
     index_tip = landmarks[8]  # Tip of the index finger
     middle_tip = landmarks[12]  # Tip of the middle finger
-    ring_pip = landmarks[14]
-    thumb_tip = landmarks[4]
 
-    is_aligned_horizontally = abs(index_tip[0] - middle_tip[0]) < 20  # y-coordinates aligned
-    is_ring_with_thumb = utils.calculate_distance(ring_pip,thumb_tip) < 50
+    is_aligned_horizontally = abs(index_tip[0] - middle_tip[0]) < align_threshold  # y-coordinates aligned
+    is_ring_with_thumb = _distance(landmarks, 14, 4) < ring_thumb_threshold  # Ring finger pip (14) with thumb tip (4)
 
     # Return True if aligned either vertically or horizontally
     # return is_aligned_vertically or is_aligned_horizontally
@@ -71,7 +83,7 @@ def is_scroll_gesture(landmarks):
 
 
 # Detecting the scroll direction
-def detect_scroll_direction(landmarks, previous_index_x, previous_index_y):
+def detect_scroll_direction(landmarks, previous_index_x, previous_index_y, major_threshold=20, minor_threshold=5):
     """Detects if the user is scrolling and determines the direction, with deviation tolerance."""
     index_tip_x = landmarks[8][0]  # x-coordinate of the index finger tip
     index_tip_y = landmarks[8][1]  # y-coordinate of the index finger tip
@@ -80,9 +92,8 @@ def detect_scroll_direction(landmarks, previous_index_x, previous_index_y):
     if previous_index_x is None or previous_index_y is None:
         return "none", index_tip_x, index_tip_y
 
-    # Define thresholds
-    major_threshold = 20  # Major movement threshold (to determine primary direction)
-    minor_threshold = 5   # Minor deviation threshold (to ignore small side movements)
+    # major_threshold: major movement threshold (to determine primary direction)
+    # minor_threshold: minor deviation threshold (to ignore small side movements)
 
     # Calculate differences
     delta_x = index_tip_x - previous_index_x
@@ -108,9 +119,23 @@ def detect_scroll_direction(landmarks, previous_index_x, previous_index_y):
     # Update previous positions
     return direction, index_tip_x, index_tip_y
 
-def is_click_gesture(landmarks):
+def evaluate_hands(points, click_threshold=CLICK_THRESHOLD, align_threshold=ALIGN_THRESHOLD, ring_thumb_threshold=RING_THUMB_THRESHOLD,
+                   thumb_ring_range=THUMB_RING_RANGE, index_middle_threshold=INDEX_MIDDLE_THRESHOLD):
+    """
+    Evaluate is_click_gesture, is_scroll_gesture and is_zoom_detected for many hands in one pass.
+    :param points: (hands, 21, 2) array of pixel landmarks.
+    :return: (click, scroll, zoom) boolean arrays with one entry per hand.
+    """
+    differences = points[:, _BATCH_PAIRS[:, 0], :2] - points[:, _BATCH_PAIRS[:, 1], :2]
+    distances = np.hypot(differences[..., 0], differences[..., 1])
+    thumb_index, index_middle, thumb_ring = distances[:, 0], distances[:, 1], distances[:, 2]
+
+    click = thumb_index < click_threshold
+    scroll = (np.abs(points[:, 8, 0] - points[:, 12, 0]) < align_threshold) & (thumb_ring < ring_thumb_threshold)
+    zoom = (thumb_ring_range[0] < thumb_ring) & (thumb_ring < thumb_ring_range[1]) & (index_middle < index_middle_threshold)
+    return click, scroll, zoom
+
+def is_click_gesture(landmarks, threshold=CLICK_THRESHOLD):
     """Detects the CLICK gesture."""
-    thumb_tip = landmarks[4]
-    index_tip = landmarks[8]
-    distance = utils.calculate_distance(thumb_tip, index_tip)
-    return distance < 20  # Adjust threshold as needed
\ No newline at end of file
+    distance = _distance(landmarks, 4, 8)  # Thumb tip to index finger tip
+    return distance < threshold  # Adjust threshold as needed
\ No newline at end of file
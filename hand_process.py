@@ -0,0 +1,142 @@
+import multiprocessing
+import queue
+import time
+from multiprocessing import shared_memory
+import numpy as np
+
+
+def landmark_points(hand_process_result):
+    """(hands, 21, 2) array of the normalized (x, y) landmarks in a MediaPipe Hands result."""
+    if not hand_process_result.multi_hand_landmarks:
+        return np.zeros((0, 21, 2), dtype=np.float32)
+    return np.array(
+        [[(lm.x, lm.y) for lm in hand_landmarks.landmark]
+         for hand_landmarks in hand_process_result.multi_hand_landmarks],
+        dtype=np.float32,
+    )
+
+
+def _inference_worker(shm_name, slots, slot_bytes, requests, results, max_num_hands, min_detection_confidence, search_model):
+    # MediaPipe is imported here so that only the worker process loads the model
+    import mediapipe as mp
+
+    models = [mp.solutions.hands.Hands(max_num_hands=max_num_hands, min_detection_confidence=min_detection_confidence)]
+    if search_model:
+        # Full-frame searches of HandROITracker, kept apart from the tracking state of the crops
+        models.append(mp.solutions.hands.Hands(static_image_mode=True, max_num_hands=max_num_hands,
+                                               min_detection_confidence=min_detection_confidence))
+    shm = shared_memory.SharedMemory(name=shm_name)
+    ring = np.ndarray((slots, slot_bytes), dtype=np.uint8, buffer=shm.buf)
+    frame = None
+    results.put((0, None))  # Ready; frame sequence numbers start at 1
+    try:
+        while True:
+            request = requests.get()
+            if request is None:  # Shutdown signal
+                break
+            if request[0] == "reset":  # Forget the hand region carried over from the previous frame
+                models[request[1]].reset()
+                continue
+            seq, slot, height, width, model = request
+
+            # The frame is read straight out of shared memory, nothing is unpickled
+            frame = ring[slot, :height * width * 3].reshape(height, width, 3)
+            # Only the normalized (x, y) landmarks travel back to the GUI process
+            results.put((seq, landmark_points(models[model].process(frame))))
+    finally:
+        # Views into the shared buffer must be gone before it can be closed
+        del frame, ring
+        for hands in models:
+            hands.close()
+        shm.close()
+
+
+class HandsProcess:
+    """Runs MediaPipe Hands in a dedicated worker process.
+
+    Frames are written as RGB into a ring of shared-memory slots and only the
+    (hands, 21, 2) array of normalized landmarks is sent back, so inference
+    does not compete with Tkinter and Pillow for the GIL. The constructor
+    returns once the worker has loaded the model. With search_model, the
+    worker also holds a static-image-mode model used by search(), for the
+    full-frame searches of a HandROITracker.
+    """
+
+    def __init__(self, max_num_hands=1, min_detection_confidence=0.7, max_frame_shape=(400, 400, 3), slots=3, timeout=1.0, startup_timeout=60.0, search_model=False):
+        self.slots = slots
+        self.slot_bytes = int(np.prod(max_frame_shape))
+        self.timeout = timeout
+        self.seq = 0
+
+        self.shm = shared_memory.SharedMemory(create=True, size=self.slot_bytes * slots)
+        self.ring = np.ndarray((slots, self.slot_bytes), dtype=np.uint8, buffer=self.shm.buf)
+
+        # Spawn rather than fork: the parent already runs camera and Tk threads
+        context = multiprocessing.get_context("spawn")
+        self.requests = context.Queue()
+        self.results = context.Queue()
+        self.worker = context.Process(
+            target=_inference_worker,
+            args=(self.shm.name, slots, self.slot_bytes, self.requests, self.results, max_num_hands, min_detection_confidence, search_model),
+            name="hand-inference-process",
+            daemon=True,
+        )
+        self.worker.start()
+
+        # Wait until the worker has loaded the model, so early frames do not run into the timeout
+        deadline = time.monotonic() + startup_timeout
+        while True:
+            try:
+                self.results.get(timeout=0.5)
+                break
+            except queue.Empty:
+                if not self.worker.is_alive() or time.monotonic() > deadline:
+                    self.close()
+                    raise RuntimeError("Hand inference process failed to start")
+
+    def process(self, frame, model=0):
+        """Detect hands in an RGB frame and return their normalized landmarks as a (hands, 21, 2) array."""
+        height, width = frame.shape[:2]
+        if height * width * 3 > self.slot_bytes:
+            raise ValueError(f"Frame of {width}x{height} does not fit in a shared-memory slot")
+
+        # Consecutive frames go to different slots, so a request that timed out
+        # can still be read by the worker while the next frame is written
+        self.seq += 1
+        slot = self.seq % self.slots
+        slot_view = self.ring[slot, :height * width * 3].reshape(height, width, 3)
+        np.copyto(slot_view, frame)
+        self.requests.put((self.seq, slot, height, width, model))
+
+        while True:
+            try:
+                seq, points = self.results.get(timeout=self.timeout)
+            except queue.Empty:
+                print("Hand inference process did not answer in time.")
+                return np.zeros((0, 21, 2), dtype=np.float32)
+            if seq == self.seq:
+                return points
+            # Otherwise it is the late answer to a frame that already timed out
+
+    # Usable wherever a locate(frame) callable is expected
+    __call__ = process
+
+    def search(self, frame):
+        return self.process(frame, model=1)
+
+    def reset(self, model=0):
+        # Queued before the next frame, so no answer needs to be waited for
+        self.requests.put(("reset", model))
+
+    def close(self):
+        if self.shm is None:
+            return
+        if self.worker.is_alive():
+            self.requests.put(None)
+            self.worker.join(timeout=2)
+            if self.worker.is_alive():
+                self.worker.terminate()
+        del self.ring
+        self.shm.close()
+        self.shm.unlink()
+        self.shm = None
@@ -2,16 +2,48 @@ import tkinter as tk
 from tkinter import ttk, filedialog
 from PIL import Image, ImageTk
 import os
-import cv2
 import threading
 import time
-import mediaPipeHandler as mph
+import argparse
+from instrumentation import profiler, StartupTimer
+from thumbnail_cache import ThumbnailCache
+from thumbnailer import ThumbnailLoader
+from tk_dispatch import TkDispatcher
+from gallery_grid import VirtualGallery, ThumbnailIndex, HighlightController
+from viewer import ImageOpener, fit_to_viewport
+from folder_watch import FolderWatcher
+from library_index import LibraryIndex
+
+# mediapipe, cv2 and the modules using them are imported by start_gesture_detection, after the window is up
+
+# Gesture guide images shipped with the app, shown at startup
+GESTURES_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gestures")
+CACHE_FLUSH_DELAY_MS = 5000  # At most one thumbnail cache index write per this many milliseconds
 
 class ImageGalleryApp:
     
-    def __init__(self, root):
+    def __init__(self, root, backend="thread", record_path=None, thumbnail_cache_bytes=256 * 1024 * 1024, target_fps=30, profile_path=None, show_perf_overlay=False, roi_tracking=False, source="camera", max_num_hands=1, startup=None, classifier_path=None, source_realtime=True, source_loop=False):
         # Initialize the main application window
         self.root = root
+        self.startup = startup or StartupTimer()  # Per-phase startup timing
+        self.stop_event = threading.Event()
+        self.gesture_detection = None  # Created once the model and camera are ready
+        self.backend = backend  # Where hand inference runs: "thread" or "process"
+        self.roi_tracking = roi_tracking  # Run hand inference on a crop around the tracked hand
+        self.source = source  # Frame source spec for frame_sources.open_source
+        self.source_realtime = source_realtime  # Pace video files and image sequences at their frame rate
+        self.source_loop = source_loop  # Restart video files and image sequences at their end
+        self.max_num_hands = max_num_hands  # Hands tracked at the same time, each with its own gesture state
+        self.classifier_path = classifier_path  # Optional gesture classifier replacing the hand-tuned thresholds
+        self.record_path = record_path  # Optional .npz file to record landmarks and gestures to
+        self.target_fps = target_fps  # Frame rate the gesture loop aims for
+        self.profile_path = profile_path  # .csv or .jsonl file the stage timings are exported to on close
+        self.show_perf_overlay = show_perf_overlay  # Draw the stage timings on the camera preview
+        self.thumbnail_cache = ThumbnailCache(max_bytes=thumbnail_cache_bytes)  # Thumbnails survive restarts
+        self.library = LibraryIndex(fallback=self.thumbnail_cache)  # Metadata and thumbnails of opened folders
+        self.dispatcher = TkDispatcher(self.root)  # Hands results of background work to the Tk thread
+        self.thumbnail_loader = ThumbnailLoader(self.library, self.dispatcher)
+        self.image_opener = ImageOpener(self.dispatcher, viewport=(400, 300))  # Decodes selected images in the background
         self.root.title("Image Gallery App")
         self.root.geometry("1000x800")  # Set the window size
 
@@ -38,8 +70,8 @@ class ImageGalleryApp:
         self.load_gestures_button = tk.Button(self.guide_panel, text="Load Gestures", command=self.load_gesture_images, width=20)
         self.load_gestures_button.pack(pady=10)
 
-        # Load gesture images by default when the app starts
-        self.load_gesture_images()
+        # Load the bundled gesture images by default once the window is shown
+        self.root.after_idle(self.load_gesture_images, GESTURES_FOLDER)
 
         # Main Image Gallery Area (Middle section)
         self.gallery_frame = tk.Frame(self.root, bg="white")
@@ -52,12 +84,22 @@ class ImageGalleryApp:
         self.scroll_y.pack(side="right", fill="y")
         self.scroll_x.pack(side="bottom", fill="x")
         self.canvas.pack(fill="both", expand=True)
-        self.canvas.configure(yscrollcommand=self.scroll_y.set, xscrollcommand=self.scroll_x.set)
-
-        # Content frame inside the canvas to hold images
-        self.gallery_content = tk.Frame(self.canvas, bg="white")
-        self.canvas.create_window((0, 0), window=self.gallery_content, anchor="nw")
-        self.gallery_content.bind("<Configure>", lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all")))
+        self.canvas.configure(yscrollcommand=self._on_canvas_yscroll, xscrollcommand=self._on_canvas_xscroll)
+
+        # Virtualized thumbnail grid drawn directly on the canvas
+        # The cache index is written a few seconds after a completed request, so a killed session keeps its thumbnails
+        self.gallery = VirtualGallery(self.canvas, self.thumbnail_loader, on_loaded=self._schedule_cache_flush)
+        self.cache_flush = None  # Pending after() id of the debounced cache index write
+        self.folder_watcher = None  # Keeps the gallery in sync with an opened folder
+        self.stopped_watchers = []  # Watchers of earlier folders, which may still be finishing a scan
+        self.guide_request = None  # Thumbnails of the gesture guide being decoded, cancelled on its own
+        self.highlight = HighlightController(self.gallery, self.root)  # Hover and selection colors
+        self.canvas.bind("<Configure>", lambda e: self.gallery.refresh())
+
+        # Cached hit-testing for gestures; any layout change in the window invalidates it
+        self.thumbnail_index = ThumbnailIndex(self.gallery, self.root)
+        self.root.bind("<Configure>", self._on_window_configure, add="+")
+        self.canvas.bind("<Button-1>", self._on_gallery_click)
 
         # Mouse wheel scrolling
         self.canvas.bind("<MouseWheel>", self._on_mouse_wheel_vertical)
@@ -67,9 +109,11 @@ class ImageGalleryApp:
         self.buttons_panel = tk.Frame(self.root, width=400, bg="lightgray")
         self.buttons_panel.grid(row=0, column=2, sticky="ns")  # The right panel will stretch vertically
 
+        # Startup and camera status
+        self.status_label = tk.Label(self.buttons_panel, text="Loading Camera...", bg="lightgray")
+        self.status_label.pack(pady=10)
+
         # Label to show the camera feed
-        self.camera_label = tk.Label(self.buttons_panel, text="Loading Camera...", bg="lightgray")
-        self.camera_label.pack(pady=10)
 
         self.camera_label = tk.Label(self.buttons_panel, bg="lightgray", width=400, height=400)
         self.camera_label.pack(pady=10)
@@ -84,9 +128,8 @@ class ImageGalleryApp:
 
         # Store the currently displayed image
         self.current_image = None
-        self.transformed_image = None
+        self.zoom_view = None  # Renders the viewer at the current zoom level
         self.original_image = None  # To keep a reference of the original image
-        self.selected_index = None  # Track the index of the selected image
         
         self.cursor = tk.Label(self.root, text="O", bg="red", fg="white")
         self.cursor.place(x=0, y=0)  # Initialize at (0, 0)
@@ -95,58 +138,45 @@ class ImageGalleryApp:
         self.load_button = tk.Button(self.buttons_panel, text="Load Images", command=self.load_images, width=20)
         self.load_button.pack(pady=10, side="bottom")
 
+        # Button to show a whole folder that is kept up to date while open
+        self.open_folder_button = tk.Button(self.buttons_panel, text="Open Folder", command=self.load_folder, width=20)
+        self.open_folder_button.pack(pady=10, side="bottom")
 
-        # List to store loaded image file paths
-        self.setup_camera_feed()
-
-    def update_selected_image(self, image_path):
-        try:
-            self.original_image = Image.open(image_path)
 
-            # Fixed dimensions for the viewer
-            target_width, target_height = 400, 300
-            original_width, original_height = self.original_image.size
+        # The model and camera load in the background; the window is usable meanwhile
+        self.root.after_idle(self.start_gesture_detection)
 
-            # Calculate scale to fit the image within the target dimensions
-            scale = min(target_width / original_width, target_height / original_height)
-            new_width = int(original_width * scale)
-            new_height = int(original_height * scale)
-
-            # Resize the image while maintaining aspect ratio
-            self.transformed_image = self.original_image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-
-            # Center the resized image in the fixed dimensions
-            centered_image = Image.new("RGB", (target_width, target_height), "white")
-            x_offset = (target_width - new_width) // 2
-            y_offset = (target_height - new_height) // 2
-            centered_image.paste(self.transformed_image, (x_offset, y_offset))
-
-            # Update the viewer with the centered image
-            self.current_image = ImageTk.PhotoImage(centered_image)
-            self.viewer_label.config(image=self.current_image, text="")
-        except Exception as e:
-         print(f"Error loading image: {e}")
+    def update_selected_image(self, image_path):
+        # Zoom gestures are ignored until the new image is ready
+        if self.zoom_view is not None:
+            self.zoom_view.close()
+            self.zoom_view = None
+
+        # Show the cached thumbnail right away, if there is one, as a first rough preview,
+        # unless the image was prefetched, in which case the opener shows the final render at once
+        if image_path not in self.image_opener.cache:
+            thumbnail = self.library.lookup(image_path, (100, 100))
+            if thumbnail is not None:
+                self._show_in_viewer(fit_to_viewport(thumbnail, (400, 300)))
+
+        # A quick draft decode and then the full-quality image follow from the background
+        self.image_opener.open(image_path, self._show_in_viewer, self._on_image_opened)
+
+    def _show_in_viewer(self, image):
+        self.current_image = ImageTk.PhotoImage(image)
+        self.viewer_label.config(image=self.current_image, text="")
+
+    def _on_image_opened(self, zoom_view, rendered):
+        self.zoom_view = zoom_view
+        self.original_image = zoom_view.pyramid.levels[0]
+        self._show_in_viewer(rendered)
         
         
     def _update_image_in_fixed_window(self):
         """Ensure the image is displayed within the fixed viewer window."""
         try:
-            # Fixed dimensions for the viewer
-            target_width, target_height = 400, 300  # Example fixed dimensions
-
-            # Create a blank canvas to center the image
-            centered_image = Image.new("RGB", (target_width, target_height), "white")
-
-            # Calculate offsets to center the image
-            image_width, image_height = self.transformed_image.size
-            x_offset = max(0, (target_width - image_width) // 2)
-            y_offset = max(0, (target_height - image_height) // 2)
-
-            # Paste the resized image onto the blank canvas
-            centered_image.paste(self.transformed_image, (x_offset, y_offset))
-
-            # Update the viewer label with the centered image
-            self.current_image = ImageTk.PhotoImage(centered_image)
+            # Only the part of the zoomed image inside the window is resampled
+            self.current_image = ImageTk.PhotoImage(self.zoom_view.render())
             self.viewer_label.config(image=self.current_image)
         except Exception as e:
             print(f"Error updating image: {e}")
@@ -156,20 +186,22 @@ class ImageGalleryApp:
         self.cursor.place(x=x, y=y)
 
     def detect_hover(self, cursor_x, cursor_y):
-        positions = self.get_thumbnail_positions()
-        for index, (x1, y1, x2, y2) in enumerate(positions):
-            if x1 <= cursor_x <= x2 and y1 <= cursor_y <= y2:
-                return index
-        return None
+        return self.thumbnail_index.index_at(cursor_x, cursor_y)
+
+    def load_gesture_images(self, gestures_folder=None):
+        # Thumbnails of a previously loaded guide would land on destroyed labels
+        if self.guide_request is not None:
+            self.guide_request.cancel()
+            self.guide_request = None
 
-    def load_gesture_images(self):
         # Clear all child widgets from self.guide_panel, effectively reset its contents.
         for widget in self.guide_panel.winfo_children():
             widget.destroy()
 
-        # Open a folder selection dialog for gesture images
-        gestures_folder = filedialog.askdirectory(title="Select Gesture Folder")
-        if not gestures_folder:  # If the user cancels the folder selection
+        # Open a folder selection dialog for gesture images, unless a folder is given
+        if gestures_folder is None:
+            gestures_folder = filedialog.askdirectory(title="Select Gesture Folder")
+        if not gestures_folder or not os.path.isdir(gestures_folder):  # If the user cancels the folder selection
             return
 
         # Get all gesture image files from the selected folder
@@ -205,68 +237,136 @@ class ImageGalleryApp:
         current_row = tk.Frame(gestures_frame, bg="gray")
         current_row.pack(fill="x")
 
-        # Display each gesture image in a table-like structure
+        # Display each gesture image in a table-like structure; the thumbnails are filled in as they are decoded
         col_count = 0
+        img_labels = []
         for gesture_image in gesture_images:
-            img_path = os.path.join(gestures_folder, gesture_image)
-
-            try:
-                # Load and display thumbnail image
-                img = Image.open(img_path)
-                img.thumbnail((100, 100))
-                img = ImageTk.PhotoImage(img)
-
-                # Create a frame for each image and label
-                frame = tk.Frame(current_row, bg="gray", padx=5, pady=5)
-                frame.pack(side="left", padx=10, pady=10)
-
-                img_label = tk.Label(frame, image=img, bg="gray")
-                img_label.image = img  # Keep a reference to avoid garbage collection
-                img_label.pack()
-
-                # Display the name of the gesture image
-                name = os.path.splitext(gesture_image)[0]
-                name_label = tk.Label(frame, text=name, bg="gray", fg="white")
-                name_label.pack()
-
-                # Update column count
-                col_count += 1
-                if col_count >= num_columns:
-                    col_count = 0
-                    current_row = tk.Frame(gestures_frame, bg="gray")
-                    current_row.pack(fill="x")
-
-            except Exception as e:
-                print(f"Error loading {img_path}: {e}")
-    
-    def setup_camera_feed(self):
-        self.stop_event = threading.Event()
-        self.gesture_detection = mph.GestureDetection(self.stop_event, self.camera_label, self.root,self)
+            # Create a frame for each image and label
+            frame = tk.Frame(current_row, bg="gray", padx=5, pady=5)
+            frame.pack(side="left", padx=10, pady=10)
+
+            img_label = tk.Label(frame, image=self.gallery.placeholder, bg="gray")
+            img_label.pack()
+            img_labels.append(img_label)
+
+            # Display the name of the gesture image
+            name = os.path.splitext(gesture_image)[0]
+            name_label = tk.Label(frame, text=name, bg="gray", fg="white")
+            name_label.pack()
+
+            # Update column count
+            col_count += 1
+            if col_count >= num_columns:
+                col_count = 0
+                current_row = tk.Frame(gestures_frame, bg="gray")
+                current_row.pack(fill="x")
+
+        def on_thumbnails(batch):
+            for index, img in batch:
+                if img is not None:
+                    img = ImageTk.PhotoImage(img)
+                    img_labels[index].configure(image=img)
+                    img_labels[index].image = img  # Keep a reference to avoid garbage collection
+
+        paths = [os.path.join(gestures_folder, gesture_image) for gesture_image in gesture_images]
+        self.guide_request = self.thumbnail_loader.request(list(enumerate(paths)), on_thumbnails, on_done=self._schedule_cache_flush)
+
+    def start_gesture_detection(self):
+        """Load the hand tracking model and open the camera in the background, then start the gesture loop."""
+        self.startup.mark("window ready")
+        self.set_status("Loading hand tracking model...")
+        threading.Thread(target=self._load_gesture_detection, name="startup", daemon=True).start()
+
+    def _load_gesture_detection(self):
+        # Runs on the startup thread; Tk is only touched through the dispatcher
+        locate = None
+        try:
+            with self.startup.phase("import mediapipe/cv2"):
+                import mediaPipeHandler as mph
+                from frame_sources import open_source
+            with self.startup.phase("hand model"):
+                locate = mph.create_locator(self.backend, self.max_num_hands, self.roi_tracking)
+                classifier = None
+                if self.classifier_path:
+                    from gesture_classifier import load_classifier
+                    classifier = load_classifier(self.classifier_path)
+            self.dispatcher.post(self.set_status, "Opening camera...")
+            with self.startup.phase("camera"):
+                source = open_source(self.source, realtime=self.source_realtime, loop=self.source_loop)
+        except Exception as e:
+            print(f"Error starting gesture detection: {e}")
+            close = getattr(locate, "close", None)  # The hand model loaded but the camera did not open
+            if close is not None:
+                close()
+            self.dispatcher.post(self.set_status, "Gesture control unavailable")
+            return
+        self.dispatcher.post(self._start_gesture_detection, mph, locate, source, classifier)
+
+    def _start_gesture_detection(self, mph, locate, source, classifier):
+        if self.stop_event.is_set():  # The window was closed while loading
+            source.release()
+            close = getattr(locate, "close", None)
+            if close is not None:
+                close()
+            return
+        self.gesture_detection = mph.GestureDetection(self.stop_event, self.camera_label, self.root,self, backend=self.backend, record_path=self.record_path, target_fps=self.target_fps, show_perf_overlay=self.show_perf_overlay, roi_tracking=self.roi_tracking, source=source, max_num_hands=self.max_num_hands, locate=locate, classifier=classifier)
         self.gesture_detection.start()
+        self.set_status("Gesture control ready")
+        self.startup.mark("gesture control ready")
+
+    def set_status(self, text):
+        self.status_label.config(text=text)
+
+    def _schedule_cache_flush(self):
+        # Batch the index writes of many finished requests into one every few seconds
+        if self.cache_flush is None:
+            self.cache_flush = self.root.after(CACHE_FLUSH_DELAY_MS, self._flush_cache)
+
+    def _flush_cache(self):
+        self.cache_flush = None
+        self.library.flush()
 
     def on_closing(self, stop_event):
         # Stop the camera feed thread and close the application window
         stop_event.set()
+        self.image_opener.shutdown()
+        if self.gesture_detection is not None:
+            self.gesture_detection.close()
+
+        # Every thread that writes to the library index must be done before it is closed
+        self._stop_folder_watcher()
+        for watcher in self.stopped_watchers:
+            watcher.stop(wait=True)
+        self.thumbnail_loader.shutdown(wait=True)
+        if self.cache_flush is not None:
+            self.root.after_cancel(self.cache_flush)
+            self.cache_flush = None
+        self.library.flush(final=True)
+        self.library.close()
+        if profiler.enabled and self.profile_path:
+            profiler.export(self.profile_path)
         self.root.destroy()
     
     def gesture_click(self, index):
         print("Clicking Event")
         """Handle the clicking gesture and update the selection highlight."""
-        thumbnails = self.gallery_content.winfo_children()
-
-        # Reset the background color of the previously selected image
-        if self.selected_index is not None:
-            thumbnails[self.selected_index].configure(bg="white")
-
-        # Highlight the newly selected image
+        # Highlight the newly selected image; only the old and new selection are repainted
         if index is not None:
-            frame = thumbnails[index]
-            frame.configure(bg="green")  # Use a distinct color for selection highlight
-            self.selected_index = index  # Update the selected index
+            self.highlight.select(index)
 
             # Open the selected image
             file_path = self.image_files[index]
             self.update_selected_image(file_path)
+            self.prefetch_neighbors(index)
+
+    def prefetch_neighbors(self, index, distance=2):
+        """Render the images around index at viewer size in the background, nearest first."""
+        neighbors = []
+        for offset in range(1, distance + 1):
+            for neighbor in (index + offset, index - offset):
+                if 0 <= neighbor < len(self.image_files):
+                    neighbors.append(self.image_files[neighbor])
+        self.image_opener.prefetch(neighbors)
 
     def gesture_scroll(self, direction):
         """Simulate scrolling in the specified direction."""
@@ -280,27 +380,19 @@ class ImageGalleryApp:
             self.canvas.xview_scroll(1, "units")
 
     def get_thumbnail_positions(self):
-        positions = []
-        for widget in self.gallery_content.winfo_children():
-            x1 = widget.winfo_rootx() - self.root.winfo_rootx()
-            y1 = widget.winfo_rooty() - self.root.winfo_rooty()
-            x2 = x1 + widget.winfo_width()
-            y2 = y1 + widget.winfo_height()
-            positions.append((x1, y1, x2, y2))
-        return positions
+        # Sequence of thumbnail boxes with an O(1) index_at() lookup, cached between layout changes
+        return self.thumbnail_index
 
     def gesture_hover(self, index):
         """Simulate hovering over an image thumbnail."""
-        thumbnails = self.gallery_content.winfo_children()
-        
-        for i, widget in enumerate(thumbnails):
-            # Reset to white unless the image is selected
-            if i != self.selected_index:
-                widget.configure(bg="white")
-        
-        # Highlight hover if it's not the selected image
-        if index is not None and index != self.selected_index:
-            thumbnails[index].configure(bg="lightblue")  # Hover color
+        # Repeated calls within a frame are merged; the cells are repainted once, if anything changed
+        if index is not None:
+            self.highlight.hover(index)
+
+    @property
+    def selected_index(self):
+        # Track the index of the selected image
+        return self.highlight.selected
 
     def _on_mouse_wheel_vertical(self, event):
         # Scroll vertically using the mouse wheel.
@@ -310,36 +402,80 @@ class ImageGalleryApp:
         # Scroll horizontally using Shift + mouse wheel.
         self.canvas.xview_scroll(-1 * int(event.delta / 120), "units")
 
+    def _on_canvas_yscroll(self, first, last):
+        # Every vertical scroll, whatever caused it, may bring new rows into view
+        self.scroll_y.set(first, last)
+        self.thumbnail_index.invalidate()
+        self.gallery.refresh()
+
+    def _on_window_configure(self, event):
+        # The gesture cursor is re-placed every frame but does not move any thumbnail
+        if event.widget is not self.cursor:
+            self.thumbnail_index.invalidate()
+
+    def _on_canvas_xscroll(self, first, last):
+        self.scroll_x.set(first, last)
+        self.thumbnail_index.invalidate()
+
+    def _on_gallery_click(self, event):
+        index = self.gallery.index_at(event.x, event.y)
+        if index is not None:
+            self.open_image(self.image_files[index])
+
+    @property
+    def image_files(self):
+        # Paths of the images in the gallery, in grid order
+        return self.gallery.paths
+
     def load_images(self):
         # Use a file dialog to select multiple image files
         files = filedialog.askopenfilenames(filetypes=[("Image Files", "*.png;*.jpg;*.jpeg")])
         if not files:
             return
 
-        # Clear existing thumbnails in the gallery
-        for widget in self.gallery_content.winfo_children():
-            widget.destroy()
-
-        self.image_files = list(files)
+        self._stop_folder_watcher()
+        self.highlight.reset()
 
-        # Display the selected images as thumbnails
-        for index, file in enumerate(self.image_files):
-            img = Image.open(file)
-            img.thumbnail((100, 100))  # Create a thumbnail of each image
-            img = ImageTk.PhotoImage(img)
+        # Cells and thumbnails are only created for the rows that are scrolled into view
+        self.gallery.set_images(files)
+        self.thumbnail_index.invalidate()
 
-            frame = tk.Frame(self.gallery_content, bg="white", padx=5, pady=5)
-            frame.grid(row=index // 6, column=index % 6, padx=10, pady=10)
+    def load_folder(self, folder=None):
+        """Show every image of a folder and keep following it as files are added, changed or deleted."""
+        if folder is None:
+            folder = filedialog.askdirectory(title="Select Image Folder")
+        if not folder:
+            return
 
-            label = tk.Label(frame, image=img)
-            label.image = img  # Keep a reference
-            label.pack()
-            label.bind("<Button-1>", lambda e, path=file: self.open_image(path))
+        folder = os.path.abspath(folder)
+        self._stop_folder_watcher()
+        self.highlight.reset()
+
+        # Show what the library index knows right away; the scan in the background only reports differences
+        known = self.library.folder_images(folder)
+        self.gallery.set_images(list(known))
+        self.thumbnail_index.invalidate()
+        self.folder_watcher = FolderWatcher(
+            folder, self.dispatcher, self._on_folder_change, known=known,
+            on_scan=lambda images, added, changed, removed: self.library.reconcile(folder, images, added, changed, removed),
+        )
 
-            # Display the image file name under the thumbnail
-            name = file.split("/")[-1]  # Get the file name
-            name_label = tk.Label(frame, text=name if name else str(index + 1), bg="white")
-            name_label.pack()
+    def _stop_folder_watcher(self):
+        if self.folder_watcher is not None:
+            self.folder_watcher.stop()
+            self.stopped_watchers = [watcher for watcher in self.stopped_watchers if watcher.thread.is_alive()]
+            self.stopped_watchers.append(self.folder_watcher)
+            self.folder_watcher = None
+
+    def _on_folder_change(self, added, changed, removed):
+        # Only the affected cells are patched; new images are appended at the end of the grid
+        if removed:
+            self.highlight.remap(self.gallery.remove_images(removed))
+        if changed:
+            self.gallery.update_images(changed)
+        if added:
+            self.gallery.add_images(added)
+        self.thumbnail_index.invalidate()
 
     def open_image(self, image_path):
         print("New Image Opened")
@@ -362,28 +498,18 @@ class ImageGalleryApp:
 
     def zoom_in(self):
         """Zoom in on the displayed image."""
-        if self.original_image:
+        if self.zoom_view:
             # Increase the scale of the image
-            width, height = self.transformed_image.size
-            scale = 1.2
-            new_width, new_height = int(width * scale), int(height * scale)
-
-            # Resize the image
-            self.transformed_image = self.original_image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+            self.zoom_view.zoom_by(1.2)
 
             # Fit the scaled image within the fixed viewer dimensions
             self._update_image_in_fixed_window()
 
     def zoom_out(self):
         """Zoom out on the displayed image."""
-        if self.original_image:
+        if self.zoom_view:
             # Decrease the scale of the image
-            width, height = self.transformed_image.size
-            scale = 0.8
-            new_width, new_height = int(width * scale), int(height * scale)
-
-            # Resize the image
-            self.transformed_image = self.original_image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+            self.zoom_view.zoom_by(0.8)
 
             # Fit the scaled image within the fixed viewer dimensions
             self._update_image_in_fixed_window()
@@ -398,7 +524,25 @@ class ImageGalleryApp:
             self.zoom_out()
 
 if __name__ == "__main__":
-    root = tk.Tk()
-    app = ImageGalleryApp(root)
+    parser = argparse.ArgumentParser(description="Gesture controlled image gallery")
+    parser.add_argument("--backend", choices=["thread", "process"], default="thread", help="Run hand inference on a thread or in a separate process")
+    parser.add_argument("--source", default="camera", help='Frames to track: "camera[:N]", "synthetic[:FRAMES]", a video file or a directory of images')
+    parser.add_argument("--full-speed", action="store_true", help="Read video files, image sequences and synthetic frames as fast as possible instead of at their frame rate")
+    parser.add_argument("--loop", action="store_true", help="Restart a video file or image sequence when it ends")
+    parser.add_argument("--max-hands", type=int, default=1, help="Maximum number of hands to track at the same time; more than 1 costs a palm detection on every frame with fewer hands in view")
+    parser.add_argument("--classifier", metavar="PATH", help="Gesture classifier fitted by gesture_classifier.py, used instead of the hand-tuned thresholds")
+    parser.add_argument("--roi", action="store_true", help="Run hand inference on a crop around the tracked hand, which makes small or distant hands larger for the model")
+    parser.add_argument("--record", metavar="PATH", help="Record hand landmarks and detected gestures to a .npz file for replay.py")
+    parser.add_argument("--thumbnail-cache-mb", type=int, default=256, help="Disk budget of the thumbnail cache in megabytes")
+    parser.add_argument("--target-fps", type=int, default=30, help="Frame rate the gesture loop aims for")
+    parser.add_argument("--profile", action="store_true", help="Time every pipeline stage and show the timings on the camera preview")
+    parser.add_argument("--profile-out", metavar="PATH", help="Export the stage timings to a .csv or .jsonl file on close")
+    args = parser.parse_args()
+    profiler.enabled = args.profile or bool(args.profile_out)
+
+    startup = StartupTimer()
+    with startup.phase("build window"):
+        root = tk.Tk()
+        app = ImageGalleryApp(root, backend=args.backend, record_path=args.record, thumbnail_cache_bytes=args.thumbnail_cache_mb * 1024 * 1024, target_fps=args.target_fps, profile_path=args.profile_out, show_perf_overlay=args.profile, roi_tracking=args.roi, source=args.source, max_num_hands=args.max_hands, startup=startup, classifier_path=args.classifier, source_realtime=not args.full_speed, source_loop=args.loop)
     root.protocol("WM_DELETE_WINDOW", lambda: app.on_closing(app.stop_event))  # Ensure camera is released when closing the app
     root.mainloop()
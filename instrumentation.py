@@ -0,0 +1,168 @@
+import csv
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class _NullSpan:
+    # Shared do-nothing context manager returned while profiling is disabled
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+def _percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class Profiler:
+    """Named timing spans with rolling p50/p95/p99 per pipeline stage.
+
+    Usage: with profiler.span("hands.process"): ...
+    or, for stages that do not fit a with block:
+    start = profiler.begin(); ...; profiler.end("gestures", start)
+    While disabled, span() returns a shared no-op context manager, so the
+    spans can stay in the code permanently. Spans may be recorded from any
+    thread. Gauges hold the latest value of a single number, like the
+    achieved FPS, and are shown and exported next to the stages.
+    """
+
+    def __init__(self, enabled=False, window=300):
+        self.enabled = enabled
+        self.window = window  # Number of most recent samples kept per stage
+        self.stages = {}      # name -> deque of durations in seconds, in first-seen order
+        self.gauges = {}      # name -> latest value, in first-seen order
+        self.lock = threading.Lock()
+        self._overlay_lines = []
+        self._overlay_gauges = ""
+        self._overlay_age = 0
+
+    def span(self, name):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def begin(self):
+        return time.perf_counter() if self.enabled else None
+
+    def end(self, name, start):
+        if start is not None:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name, seconds):
+        with self.lock:
+            samples = self.stages.get(name)
+            if samples is None:
+                samples = self.stages[name] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def set_gauge(self, name, value):
+        if self.enabled and value is not None:
+            self.gauges[name] = value
+
+    def summary(self):
+        """List of (stage, samples, p50, p95, p99), times in milliseconds."""
+        with self.lock:
+            stages = [(name, list(samples)) for name, samples in self.stages.items()]
+        rows = []
+        for name, values in stages:
+            values.sort()
+            if values:
+                rows.append((name, len(values),
+                             _percentile(values, 0.50) * 1000,
+                             _percentile(values, 0.95) * 1000,
+                             _percentile(values, 0.99) * 1000))
+        return rows
+
+    def draw_overlay(self, frame, origin=(10, 240), refresh_frames=15):
+        """Draw the per-stage percentiles onto a frame, below the gesture feedback text."""
+        if not self.enabled:
+            return
+        import cv2  # Only needed for the overlay; keeps this module cheap to import at startup
+        # Sorting every window on every frame is wasteful; the text is refreshed periodically
+        self._overlay_age -= 1
+        if self._overlay_age <= 0:
+            self._overlay_lines = [f"{name[:14]:<14} {p50:5.1f} {p95:5.1f} {p99:5.1f}" for name, _, p50, p95, p99 in self.summary()]
+            self._overlay_gauges = "  ".join(f"{name} {value:.1f}" for name, value in list(self.gauges.items()))
+            self._overlay_age = refresh_frames
+        x, y = origin
+        if self._overlay_gauges:
+            cv2.putText(frame, self._overlay_gauges, (x, y - 14), cv2.FONT_HERSHEY_PLAIN, 0.8, (255, 255, 0), 1)
+        cv2.putText(frame, "stage ms       p50   p95   p99", (x, y), cv2.FONT_HERSHEY_PLAIN, 0.8, (255, 255, 0), 1)
+        for line in self._overlay_lines:
+            y += 12
+            cv2.putText(frame, line, (x, y), cv2.FONT_HERSHEY_PLAIN, 0.8, (255, 255, 0), 1)
+
+    def export(self, path):
+        """Append the current summary and gauges to a .csv file, or to a JSON Lines file for any other extension."""
+        timestamp = time.time()
+        rows = self.summary()
+        gauges = list(self.gauges.items())
+        if path.endswith(".csv"):
+            with open(path, "a", newline="") as f:
+                writer = csv.writer(f)
+                if f.tell() == 0:
+                    writer.writerow(["timestamp", "stage", "samples", "p50_ms", "p95_ms", "p99_ms"])
+                for row in rows:
+                    writer.writerow([f"{timestamp:.3f}", *row[:2], *(f"{value:.3f}" for value in row[2:])])
+                for name, value in gauges:
+                    writer.writerow([f"{timestamp:.3f}", name, "", f"{value:.3f}", "", ""])  # A gauge has one value, in the p50 column
+        else:
+            with open(path, "a") as f:
+                for name, count, p50, p95, p99 in rows:
+                    f.write(json.dumps({"timestamp": timestamp, "stage": name, "samples": count,
+                                        "p50_ms": p50, "p95_ms": p95, "p99_ms": p99}) + "\n")
+                for name, value in gauges:
+                    f.write(json.dumps({"timestamp": timestamp, "gauge": name, "value": value}) + "\n")
+
+
+class StartupTimer:
+    """Prints how long each startup phase took and when it finished, relative to launch.
+
+    Phases may run on different threads, e.g. the window on the Tk thread
+    while the model loads in the background.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases = []  # (name, duration, finished after) in seconds
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.mark(name, time.perf_counter() - started)
+
+    def mark(self, name, duration=None):
+        """Record a point of the startup, optionally with the duration of the phase that ended there."""
+        at = time.perf_counter() - self.start
+        self.phases.append((name, duration, at))
+        took = f"{duration * 1000:7.0f} ms" if duration is not None else " " * 10
+        print(f"Startup: {name:<24} {took}   at {at * 1000:6.0f} ms")
+
+
+# Shared by every module of the gesture pipeline; enabled with the app's --profile option
+profiler = Profiler()
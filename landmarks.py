@@ -0,0 +1,62 @@
+import numpy as np
+
+NUM_LANDMARKS = 21
+
+
+def to_pixels(normalized, width, height, out=None):
+    """Scale a (hands, 21, 2) array of normalized landmarks to pixels, truncated like HandLandmarks.update."""
+    out = np.multiply(normalized[..., :2], np.array([width, height], dtype=np.float32), out=out)
+    return np.trunc(out, out=out)
+
+
+class HandLandmarks:
+    """Pixel landmarks of one hand, kept in a preallocated (21, 2) or (21, 3) array.
+
+    The same object is updated in place every frame. Indexing works like the old
+    list of [x, y] points (landmarks[8][0]), and the pairwise distances between
+    all landmarks are computed at most once per frame, on first use.
+    """
+
+    def __init__(self, dims=2):
+        self.points = np.zeros((NUM_LANDMARKS, dims), dtype=np.float32)
+        self._differences = np.empty((NUM_LANDMARKS, NUM_LANDMARKS, 2), dtype=np.float32)
+        self._distances = np.empty((NUM_LANDMARKS, NUM_LANDMARKS), dtype=np.float32)
+        self._distances_valid = False
+
+    def update(self, normalized, width, height):
+        """Load normalized MediaPipe coordinates for a frame of the given size."""
+        np.multiply(normalized[:, 0], width, out=self.points[:, 0])
+        np.multiply(normalized[:, 1], height, out=self.points[:, 1])
+        # Truncate like int(lm.x * width) so the pixel thresholds in gestures.py behave the same
+        np.trunc(self.points[:, :2], out=self.points[:, :2])
+        if self.points.shape[1] == 3 and normalized.shape[1] == 3:
+            np.multiply(normalized[:, 2], width, out=self.points[:, 2])  # MediaPipe scales z like x
+        self._distances_valid = False
+
+    def set_pixels(self, points):
+        """Load landmarks that are already in pixels, e.g. one hand of to_pixels."""
+        self.points[:, :2] = points[:, :2]
+        self._distances_valid = False
+
+    def __len__(self):
+        return NUM_LANDMARKS
+
+    def __getitem__(self, index):
+        return self.points[index]
+
+    def point(self, index):
+        """Integer (x, y) of a landmark, ready for cv2 drawing calls."""
+        return int(self.points[index, 0]), int(self.points[index, 1])
+
+    @property
+    def distances(self):
+        """(21, 21) matrix of 2D distances between every pair of landmarks."""
+        if not self._distances_valid:
+            xy = self.points[:, :2]
+            np.subtract(xy[:, np.newaxis, :], xy[np.newaxis, :, :], out=self._differences)
+            np.hypot(self._differences[..., 0], self._differences[..., 1], out=self._distances)
+            self._distances_valid = True
+        return self._distances
+
+    def distance(self, a, b):
+        return float(self.distances[a, b])
@@ -0,0 +1,127 @@
+import io
+import os
+import sqlite3
+import threading
+from PIL import Image
+from thumbnail_cache import decode_thumbnail_info
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.expanduser("~"), ".cache", "hci_image_gallery", "library.sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+    path TEXT PRIMARY KEY,
+    folder TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    width INTEGER,
+    height INTEGER,
+    orientation INTEGER,
+    thumbnail_box TEXT,
+    thumbnail BLOB
+);
+CREATE INDEX IF NOT EXISTS images_folder ON images (folder, path);
+"""
+
+
+class LibraryIndex:
+    """Persistent index of the images in opened folders, in SQLite.
+
+    Every image has its modification time, file size, pixel dimensions, EXIF
+    orientation and a PNG thumbnail, so reopening a folder is one query and
+    thumbnails of unchanged files are never decoded again. Rows are
+    reconciled against the folder scans of FolderWatcher; the dimensions and
+    thumbnail of a new or changed file are filled in when its thumbnail is
+    first needed. Images outside indexed folders are passed on to the
+    fallback ThumbnailCache.
+
+    The database runs in WAL mode, so the Tk thread can read while the
+    watcher and thumbnail threads write. It is safe to use from any thread.
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_PATH, fallback=None):
+        self.path = path
+        self.fallback = fallback
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")  # Enough for a cache; WAL keeps it consistent
+        self.connection.executescript(_SCHEMA)
+
+    def folder_images(self, folder):
+        """{path: (mtime_ns, size)} of the indexed images of a folder, in name order."""
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT path, mtime_ns, size FROM images WHERE folder = ? ORDER BY path", (folder,)
+            ).fetchall()
+        return {path: (mtime_ns, size) for path, mtime_ns, size in rows}
+
+    def reconcile(self, folder, images, added, changed, removed):
+        """Bring the rows of a folder in line with a scan; images is {path: (mtime_ns, size)}.
+
+        Changed files lose their dimensions and thumbnail, which are read
+        again on the next get_thumbnail.
+        """
+        with self.lock, self.connection:
+            self.connection.executemany("DELETE FROM images WHERE path = ?", ((path,) for path in removed))
+            self.connection.executemany(
+                "INSERT INTO images (path, folder, mtime_ns, size) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (path) DO UPDATE SET mtime_ns = excluded.mtime_ns, size = excluded.size, "
+                "width = NULL, height = NULL, orientation = NULL, thumbnail_box = NULL, thumbnail = NULL",
+                ((path, folder, *images[path]) for path in (*added, *changed)),
+            )
+
+    def _row(self, path):
+        with self.lock:
+            return self.connection.execute(
+                "SELECT mtime_ns, size, thumbnail_box, thumbnail FROM images WHERE path = ?", (path,)
+            ).fetchone()
+
+    def lookup(self, path, size=(100, 100)):
+        """Return the stored thumbnail of the image at path without ever decoding it, or None."""
+        row = self._row(path)
+        if row is None:
+            return self.fallback.lookup(path, size) if self.fallback is not None else None
+        mtime_ns, file_size, box, blob = row
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if blob is None or box != f"{size[0]}x{size[1]}" or (stat.st_mtime_ns, stat.st_size) != (mtime_ns, file_size):
+            return None
+        with Image.open(io.BytesIO(blob)) as img:
+            img.load()
+            return img
+
+    def get_thumbnail(self, path, size=(100, 100)):
+        """Return a thumbnail of the image at path, decoding the original only when the index has none."""
+        row = self._row(path)
+        if row is None:
+            if self.fallback is not None:
+                return self.fallback.get_thumbnail(path, size)
+            row = (None, None, None, None)
+
+        img = self.lookup(path, size) if row[3] is not None else None
+        if img is not None:
+            return img
+
+        stat = os.stat(path)
+        img, (width, height), orientation = decode_thumbnail_info(path, size)
+        buffer = io.BytesIO()
+        img.save(buffer, "PNG")
+
+        with self.lock, self.connection:
+            self.connection.execute(
+                "UPDATE images SET mtime_ns = ?, size = ?, width = ?, height = ?, orientation = ?, thumbnail_box = ?, thumbnail = ? "
+                "WHERE path = ?",
+                (stat.st_mtime_ns, stat.st_size, width, height, orientation, f"{size[0]}x{size[1]}", buffer.getvalue(), path),
+            )
+        return img
+
+    def flush(self, final=False):
+        if self.fallback is not None:
+            self.fallback.flush(final)
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
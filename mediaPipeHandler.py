@@ -1,37 +1,110 @@
 import mediapipe as mp
 import cv2
+import numpy as np
 import gestures
-import time
-import mediaPipeHandler as mph
+import threading
+import pipeline
+import hand_process
+from roi import HandROITracker
+from frame_sources import CameraSource
+from gesture_engine import MultiHandGestureEngine, event_name
+from recording import LandmarkRecorder
+from frame_scheduler import FrameScheduler
+from instrumentation import profiler
 import tkinter as tk
 from tkinter import ttk, filedialog
 from PIL import Image, ImageTk
 
 mpHands = mp.solutions.hands
-hands = mpHands.Hands(max_num_hands=1, min_detection_confidence=0.7)
 mpDraw = mp.solutions.drawing_utils
 
-default_landmark_spec = mpDraw.DrawingSpec(color=(0, 0, 255), thickness=2, circle_radius=2)  # Red color
+default_landmark_spec = mpDraw.DrawingSpec(color=(255, 0, 0), thickness=2, circle_radius=2)  # Red color (frames are RGB)
 default_connection_spec = mpDraw.DrawingSpec(color=(255, 255, 255), thickness=2)  # White color
 
 # Printing Commands on the screen 
 def print_command(frame,command_text):
     cv2.putText(frame, command_text, (50,50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
 
+class MediaPipeHands:
+    """Runs MediaPipe Hands on the calling thread; returns the normalized landmarks of an RGB image as a (hands, 21, 2) array."""
+
+    def __init__(self, max_num_hands=1, min_detection_confidence=0.7, static_image_mode=False):
+        self.hands = mpHands.Hands(static_image_mode=static_image_mode, max_num_hands=max_num_hands, min_detection_confidence=min_detection_confidence)
+
+    def __call__(self, frame):
+        return hand_process.landmark_points(self.hands.process(frame))
+
+    def reset(self):
+        # Forget the hand region carried over from the previous image
+        self.hands.reset()
+
+    def close(self):
+        self.hands.close()
+
+# Draws a hand skeleton from pixel landmarks
+def draw_hand(frame, landmarks):
+    for start, end in mpHands.HAND_CONNECTIONS:
+        cv2.line(frame, tuple(landmarks[start]), tuple(landmarks[end]), default_connection_spec.color, default_connection_spec.thickness)
+    for point in landmarks:
+        cv2.circle(frame, tuple(point), default_landmark_spec.circle_radius, default_landmark_spec.color, default_landmark_spec.thickness)
+
+class HandsDetector:
+    """Runs on the inference thread: locates the hands in an RGB frame, draws their skeletons and returns the normalized landmarks.
+
+    locate is a MediaPipeHands, a HandsProcess (model in a separate process) or
+    either of them wrapped in a HandROITracker.
+    """
+
+    def __init__(self, locate):
+        self.locate = locate
+
+    def __call__(self, frame):
+        with profiler.span("hands.process"):
+            detected = self.locate(frame)
+        with profiler.span("draw_landmarks"):
+            for points in detected:
+                draw_hand(frame, (points * (frame.shape[1], frame.shape[0])).astype(np.int32).tolist())
+        return detected
+
+    def close(self):
+        close = getattr(self.locate, "close", None)
+        if close is not None:
+            close()
+
+# Builds the hand locator; loading the model takes a while, so the app calls this off the Tk thread
+def create_locator(backend="thread", max_num_hands=1, roi_tracking=False):
+    # "thread" runs inference on a thread of this process, "process" in a separate worker process
+    if backend == "process":
+        locate = hand_process.HandsProcess(max_num_hands=max_num_hands, min_detection_confidence=0.7, search_model=roi_tracking)
+        search = locate.search
+    else:
+        locate = MediaPipeHands(max_num_hands=max_num_hands, min_detection_confidence=0.7)
+        search = MediaPipeHands(max_num_hands=max_num_hands, min_detection_confidence=0.7, static_image_mode=True) if roi_tracking else None
+    if roi_tracking:
+        # Tracked hands are located in a crop around them; full-frame searches use their own model instance
+        locate = HandROITracker(locate, search, reset=locate.reset)
+    return locate
+
 class GestureDetection:
-    def __init__(self, stop_event, camera_label, root,app):
-        self.stop_event = stop_event
+    def __init__(self, stop_event, camera_label, root,app, backend="thread", record_path=None, target_fps=30, show_perf_overlay=False, roi_tracking=False, source=None, max_num_hands=1, locate=None, classifier=None):
+        self.stop_event = stop_event  # Set by the app when it closes
         self.camera_label = camera_label
         self.root = root
-        self.camera = cv2.VideoCapture(0)
-        self.trail = []
+        self.camera = source if source is not None else CameraSource(0)  # Any frame_sources.FrameSource
+        if locate is None:
+            locate = create_locator(backend, max_num_hands, roi_tracking)
+        self.detector = HandsDetector(locate)
+        # The pipeline has its own stop event, so it can also be stopped when a finite source ends
+        self.pipeline = pipeline.GesturePipeline(self.camera, self.detector, threading.Event())
+        self.trails = {}  # hand id -> recent index fingertip positions of that hand
         self.trail_max_length = 10
         self.trail_color = (0, 255, 0)
         self.trail_start_radius = 10
-        self.previous_index_x = None
-        self.previous_index_y = None
-        self.previous_distance = None
-        self.last_gesture_time = time.time()
+        self.gesture_engine = MultiHandGestureEngine(classifier=classifier)  # Gesture state of every tracked hand
+        self.recorder = LandmarkRecorder(record_path) if record_path else None
+        self.scheduler = FrameScheduler(target_fps)  # Paces update_frame and drops stages when behind
+        self.show_perf_overlay = show_perf_overlay  # Draw per-stage timings on the camera preview
+        self.photo = None  # Persistent camera preview image
         self.app = app 
 
 
@@ -51,92 +124,129 @@ class GestureDetection:
 
     
     def update_frame(self):
-        if self.stop_event.is_set():
-            self.camera.release()
+        # Capture and inference run on their own threads; only the newest result is handled here
+        if self.stop_event.is_set() or not self.pipeline.is_running():
+            if self.pipeline.error is not None:
+                self.app.set_status(f"Gesture control stopped: {self.pipeline.error}")
+            self.close()
             return
 
-        isCapturedFrameSuccessful, frame = self.camera.read()
-        if not isCapturedFrameSuccessful:
-            print("An error happened.")
-            self.camera.release()
+        result = self.pipeline.latest_result()
+        if result is None:
+            self.root.after(self.scheduler.poll_ms, self.update_frame)
             return
 
-        frame = cv2.resize(frame, (400, 400))
-        frame = cv2.flip(frame, 1)
-        framergb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-        # Process hand landmarks
-        hand_process_result = mph.hands.process(framergb)
-
-        if hand_process_result.multi_hand_landmarks:
-            for hand_landmarks in hand_process_result.multi_hand_landmarks:
-                landmarks = []
-                for idx, lm in enumerate(hand_landmarks.landmark):  # Iterate through each landmark
-                    x = int(lm.x * frame.shape[1])  # Get x coordinate
-                    y = int(lm.y * frame.shape[0])  # Get y coordinate
-                    landmarks.append([x, y])
-
-                # Detect hover gesture
-                hovered_index = gestures.is_hover_gesture(landmarks, self.app.get_thumbnail_positions())
-                if hovered_index != -1:  # Ensure hovered_index is valid
-                    self.app.gesture_hover(hovered_index)
-
-                # Draw connections first
-                mph.mpDraw.draw_landmarks(frame, hand_landmarks, mph.mpHands.HAND_CONNECTIONS, mph.default_landmark_spec, mph.default_connection_spec)
-
-                # Draw the filled green circle for the index finger tip
-                index_tip = landmarks[8]
-                cv2.circle(frame, (index_tip[0], index_tip[1]), 5, (0, 255, 0), -1)
-                self.move_cursor(index_tip)
-
-                # Add the index finger position to the trail
-                self.trail.append(index_tip)
-                if len(self.trail) > self.trail_max_length:
-                    self.trail.pop(0)
-
-                # Draw the ripple trail
-                for i, point in enumerate(self.trail):
-                    radius = self.trail_start_radius - int((i / self.trail_max_length) * self.trail_start_radius)
-                    cv2.circle(frame, point, radius, self.trail_color, 1)
-
-                # Gesture detection with visual feedback
-                if gestures.is_click_gesture(landmarks) and time.time() - self.last_gesture_time > 1:
-                    cv2.putText(frame, "Click", (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2, cv2.LINE_AA)
-                    gui_width = self.root.winfo_width()
-                    gui_height = self.root.winfo_height()
-                    cursor_x = int(index_tip[0] / 400 * gui_width)
-                    cursor_y = int(index_tip[1] / 400 * gui_height)
-                    hovered_index = self.app.detect_hover(cursor_x, cursor_y)
-                    self.app.gesture_click(hovered_index)
-                    self.last_gesture_time = time.time()
-
-                elif gestures.is_scroll_gesture(landmarks) and time.time() - self.last_gesture_time > 1:
-                    direction, self.previous_index_x, self.previous_index_y = gestures.detect_scroll_direction(
-                        landmarks, self.previous_index_x, self.previous_index_y
-                    )
-                    if direction != "none":
-                        cv2.putText(frame, f"Scrolling: {direction}", (50, 100), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2, cv2.LINE_AA)
-                        self.last_gesture_time = time.time()
-                        self.app.gesture_scroll(direction)
-
-                elif gestures.is_zoom_detected(landmarks) and time.time() - self.last_gesture_time > 1:
-                    zoom_direction, self.previous_distance = gestures.detect_zoom_direction(landmarks, self.previous_distance)
-                    if zoom_direction != "":
-                        cv2.putText(frame, f"Zooming: {zoom_direction}", (50, 150), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2, cv2.LINE_AA)
-                        self.app.gesture_zoom(zoom_direction)
-                        self.last_gesture_time = time.time()
-
-        # Convert frame to ImageTk format
-        img = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
-        img_tk = ImageTk.PhotoImage(image=img)
-
-        # Update the label
-        self.camera_label.img_tk = img_tk  # Keep a reference
-        self.camera_label.configure(image=img_tk)
-
-        # Schedule the next frame update
-        self.root.after(10, self.update_frame)
+        self.scheduler.begin()
+        frame_start = profiler.begin()
+        draw_overlay = self.scheduler.should_draw_overlay()
+        frame = result.frame  # RGB, drawn on in place and handed back to the pipeline below
+        events = []
+        gestures_start = profiler.begin()
+
+        # The rules are evaluated for all hands in one batch, which also gives every hand a stable id
+        hand_events = self.gesture_engine.process(result.hands, (frame.shape[1], frame.shape[0]), result.timestamp)
+        points = self.gesture_engine.points  # Pixel landmarks, one row per hand of this frame
+        ids = self.gesture_engine.ids
+        index_tips = {hand_id: (int(points[row, 8, 0]), int(points[row, 8, 1])) for row, hand_id in enumerate(ids)}
+
+        # The cursor and hover follow one hand, the one with the lowest id
+        if ids:
+            primary = min(ids)
+            hovered_index = gestures.is_hover_gesture(points[ids.index(primary)], self.app.get_thumbnail_positions())
+            if hovered_index != -1:  # Ensure hovered_index is valid
+                self.app.gesture_hover(hovered_index)
+            self.move_cursor(index_tips[primary])
+
+        # Every hand has its own trail of index finger positions
+        for hand_id, index_tip in index_tips.items():
+            trail = self.trails.setdefault(hand_id, [])
+            trail.append(index_tip)
+            if len(trail) > self.trail_max_length:
+                trail.pop(0)
+        for hand_id in [hand_id for hand_id in self.trails if hand_id not in index_tips]:
+            del self.trails[hand_id]
+
+        if draw_overlay:
+            with profiler.span("overlay"):
+                for hand_id, trail in self.trails.items():
+                    # Draw the filled green circle for the index finger tip
+                    cv2.circle(frame, trail[-1], 5, (0, 255, 0), -1)
+
+                    # Draw the ripple trail
+                    for i, point in enumerate(trail):
+                        radius = self.trail_start_radius - int((i / self.trail_max_length) * self.trail_start_radius)
+                        cv2.circle(frame, point, radius, self.trail_color, 1)
+
+        # Gesture detection with visual feedback
+        for hand_id, event in hand_events:
+            name = event_name(event)
+            if name is None:
+                continue
+            events.append((hand_id, name))
+            gesture, phase, value = event.gesture, event.phase, event.value
+
+            if gesture == "click" and phase == "start":
+                cv2.putText(frame, "Click", (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 0), 2, cv2.LINE_AA)
+                index_tip = index_tips[hand_id]
+                gui_width = self.root.winfo_width()
+                gui_height = self.root.winfo_height()
+                cursor_x = int(index_tip[0] / 400 * gui_width)
+                cursor_y = int(index_tip[1] / 400 * gui_height)
+                hovered_index = self.app.detect_hover(cursor_x, cursor_y)
+                self.app.gesture_click(hovered_index)
+
+            elif gesture == "scroll" and phase == "update":
+                cv2.putText(frame, f"Scrolling: {value}", (50, 100), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 0), 2, cv2.LINE_AA)
+                self.app.gesture_scroll(value)
+
+            elif gesture == "zoom" and phase == "update":
+                cv2.putText(frame, f"Zooming: {value}", (50, 150), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 0), 2, cv2.LINE_AA)
+                self.app.gesture_zoom(value)
+
+            else:
+                continue  # The other start and end events trigger no action
+
+            self.scheduler.record_action(result.timestamp)
+
+        profiler.end("gestures", gestures_start)
+
+        if self.recorder is not None:
+            self.recorder.add(result.timestamp, result.hands, (frame.shape[1], frame.shape[0]), events)
+
+        if self.show_perf_overlay:
+            profiler.draw_overlay(frame)
+
+        if self.scheduler.should_display():
+            size = (frame.shape[1], frame.shape[0])
+            if self.photo is None or (self.photo.width(), self.photo.height()) != size:
+                # One PhotoImage for the whole session; later frames are pasted into it
+                self.photo = ImageTk.PhotoImage("RGB", size)
+                self.camera_label.img_tk = self.photo  # Keep a reference
+                self.camera_label.configure(image=self.photo)
+            with profiler.span("fromarray"):
+                img = Image.frombuffer("RGB", size, frame, "raw", "RGB", 0, 1)  # Wraps the frame without copying
+            with profiler.span("PhotoImage paste"):
+                self.photo.paste(img)
+
+        # The frame buffer goes back to the pipeline once it is no longer needed
+        self.pipeline.release(result)
+        profiler.end("gui frame", frame_start)
+
+        # Schedule the next frame update so that frames start once per frame budget
+        self.root.after(self.scheduler.end(), self.update_frame)
 
     def start(self):
+        self.pipeline.start()
         self.update_frame()
 
+    def close(self):
+        # Stop the threads before closing the locator they call; close() may run more than once
+        self.pipeline.stop()
+        if self.detector is not None:
+            self.detector.close()
+            self.detector = None
+        if self.recorder is not None and len(self.recorder):
+            self.recorder.save()
+            print(f"Saved {len(self.recorder)} recorded frames to {self.recorder.path}")
+            self.recorder = None
+
@@ -0,0 +1,200 @@
+import queue
+import threading
+import time
+import cv2
+import numpy as np
+from instrumentation import profiler
+
+
+class LatestValue:
+    """Thread-safe single-slot hand-off that only keeps the newest value.
+
+    Putting a value while an older one is still waiting replaces it, so a slow
+    consumer never works through a backlog of stale frames. on_drop is called
+    with every value replaced this way.
+    """
+
+    def __init__(self, on_drop=None):
+        self._condition = threading.Condition()
+        self._value = None
+        self.on_drop = on_drop
+        self.dropped = 0  # Number of values overwritten before being taken
+
+    def put(self, value):
+        with self._condition:
+            replaced, self._value = self._value, value
+            if replaced is not None:
+                self.dropped += 1
+            self._condition.notify()
+        if replaced is not None and self.on_drop is not None:
+            self.on_drop(replaced)
+
+    def get(self, timeout=None):
+        """Wait for a value (up to timeout seconds) and take it, or return None."""
+        with self._condition:
+            if self._value is None:
+                self._condition.wait(timeout)
+            value, self._value = self._value, None
+            return value
+
+    def get_nowait(self):
+        with self._condition:
+            value, self._value = self._value, None
+            return value
+
+
+class BufferPool:
+    """Recycles preallocated frame buffers between pipeline stages.
+
+    A buffer is acquired by the stage that fills it and released by the last
+    stage that reads it, so steady-state operation allocates no frames at all.
+    """
+
+    def __init__(self, shape, dtype=np.uint8):
+        self.shape = shape
+        self.dtype = dtype
+        self.free = queue.SimpleQueue()
+        self.allocated = 0  # Buffers created so far; stops growing once the pipeline is warm
+
+    def acquire(self):
+        try:
+            return self.free.get_nowait()
+        except queue.Empty:
+            self.allocated += 1
+            return np.empty(self.shape, dtype=self.dtype)
+
+    def release(self, buffer):
+        self.free.put(buffer)
+
+
+class CapturedFrame:
+    def __init__(self, frame, timestamp):
+        self.frame = frame          # Resized and mirrored BGR frame, owned by the capture pool
+        self.timestamp = timestamp  # time.time() when the frame was read
+
+
+class FrameResult:
+    def __init__(self, frame, hands, timestamp):
+        self.frame = frame          # RGB frame with the hand skeleton drawn on it, owned by the display pool
+        self.hands = hands          # (hands, 21, 2) normalized landmarks
+        self.timestamp = timestamp  # Capture time of the frame
+
+
+class CaptureThread(threading.Thread):
+    """Reads the camera (or any frame source) as fast as it delivers frames and publishes the newest one."""
+
+    def __init__(self, camera, frames, pool, stop_event, frame_size=(400, 400)):
+        super().__init__(name="camera-capture", daemon=True)
+        self.camera = camera
+        self.frames = frames
+        self.pool = pool
+        self.stop_event = stop_event
+        self.frame_size = frame_size
+        self.failed = False
+
+    def run(self):
+        raw = None
+        resized = np.empty((self.frame_size[1], self.frame_size[0], 3), dtype=np.uint8)
+        try:
+            while not self.stop_event.is_set():
+                with profiler.span("capture"):
+                    isCapturedFrameSuccessful, raw = self.camera.read(raw)  # Reuses raw once it has the camera's shape
+                if not isCapturedFrameSuccessful:
+                    print("End of input." if getattr(self.camera, "finished", False) else "An error happened.")
+                    self.failed = True
+                    return
+                timestamp = time.time()
+
+                frame = self.pool.acquire()
+                with profiler.span("resize"):
+                    cv2.resize(raw, self.frame_size, dst=resized)
+                with profiler.span("flip"):
+                    cv2.flip(resized, 1, dst=frame)
+                self.frames.put(CapturedFrame(frame, timestamp))
+        finally:
+            self.camera.release()
+
+
+class InferenceThread(threading.Thread):
+    """Converts the newest captured frame to RGB, runs hand detection on it and publishes the result.
+
+    detect is called with the RGB frame, may draw on it, and returns the
+    normalized landmarks of every detected hand. The same RGB buffer is then
+    shown by the GUI, so the frame is converted only once. If detect
+    raises, the thread ends and keeps the exception in error.
+    """
+
+    def __init__(self, detect, frames, results, capture_pool, display_pool, stop_event):
+        super().__init__(name="hand-inference", daemon=True)
+        self.detect = detect
+        self.frames = frames
+        self.results = results
+        self.capture_pool = capture_pool
+        self.display_pool = display_pool
+        self.stop_event = stop_event
+        self.error = None
+
+    def run(self):
+        # The detector is closed by whoever stops the pipeline, after this thread has finished
+        framergb = None
+        try:
+            while not self.stop_event.is_set():
+                captured = self.frames.get(timeout=0.1)
+                if captured is None:
+                    continue
+                framergb = self.display_pool.acquire()
+                with profiler.span("cvtColor rgb"):
+                    cv2.cvtColor(captured.frame, cv2.COLOR_BGR2RGB, dst=framergb)
+                self.capture_pool.release(captured.frame)
+
+                hands = self.detect(framergb)
+                self.results.put(FrameResult(framergb, hands, captured.timestamp))
+                framergb = None
+        except Exception as e:
+            print(f"Hand inference failed: {e}")
+            self.error = e
+            if framergb is not None:
+                self.display_pool.release(framergb)
+
+
+class GesturePipeline:
+    """Capture thread -> inference thread -> newest result for the GUI.
+
+    Frames travel in pooled buffers: the GUI hands each result back with
+    release() once it has been displayed.
+    """
+
+    def __init__(self, camera, detect, stop_event, frame_size=(400, 400)):
+        self.stop_event = stop_event
+        shape = (frame_size[1], frame_size[0], 3)
+        self.capture_pool = BufferPool(shape)
+        self.display_pool = BufferPool(shape)
+        self.frames = LatestValue(on_drop=lambda captured: self.capture_pool.release(captured.frame))
+        self.results = LatestValue(on_drop=self.release)
+        self.capture = CaptureThread(camera, self.frames, self.capture_pool, stop_event, frame_size)
+        self.inference = InferenceThread(detect, self.frames, self.results, self.capture_pool, self.display_pool, stop_event)
+
+    def start(self):
+        self.capture.start()
+        self.inference.start()
+
+    def latest_result(self):
+        return self.results.get_nowait()
+
+    def release(self, result):
+        self.display_pool.release(result.frame)
+
+    def is_running(self):
+        return not self.capture.failed and self.inference.error is None and not self.stop_event.is_set()
+
+    @property
+    def error(self):
+        """The exception that stopped hand inference, or None."""
+        return self.inference.error
+
+    def stop(self, timeout=2.0):
+        """Stop the capture and inference threads and wait for them to finish."""
+        self.stop_event.set()
+        for thread in (self.capture, self.inference):
+            if thread.is_alive():
+                thread.join(timeout)
@@ -0,0 +1,90 @@
+import numpy as np
+
+
+class LandmarkRecorder:
+    """Collects per-frame landmarks, timestamps and gesture events and saves them as one .npz file.
+
+    Frames are stored flat: hand_counts[i] hands of frame i follow each other in
+    points, and events refer to frames by index.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.frame_size = None
+        self.timestamps = []
+        self.hand_counts = []
+        self.points = []
+        self.event_frames = []
+        self.event_hands = []
+        self.event_names = []
+
+    def add(self, timestamp, hands, frame_size, events=()):
+        """Record one frame.
+
+        :param hands: (hands, 21, 2) array of normalized landmarks.
+        :param frame_size: (width, height) the landmarks are scaled to.
+        :param events: (hand_index, event_name) pairs detected in this frame.
+        """
+        self.frame_size = frame_size
+        frame_index = len(self.timestamps)
+        self.timestamps.append(timestamp)
+        self.hand_counts.append(len(hands))
+        if len(hands):
+            self.points.append(np.asarray(hands, dtype=np.float32))
+        for hand_index, name in events:
+            self.event_frames.append(frame_index)
+            self.event_hands.append(hand_index)
+            self.event_names.append(name)
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def save(self):
+        points = np.concatenate(self.points) if self.points else np.zeros((0, 21, 2), dtype=np.float32)
+        # Through a file object, as np.savez_compressed would add ".npz" to a path without it
+        with open(self.path, "wb") as f:
+            np.savez_compressed(
+                f,
+                frame_size=np.array(self.frame_size or (400, 400), dtype=np.int32),
+                timestamps=np.array(self.timestamps, dtype=np.float64),
+                hand_counts=np.array(self.hand_counts, dtype=np.int8),
+                points=points,
+                event_frames=np.array(self.event_frames, dtype=np.int32),
+                event_hands=np.array(self.event_hands, dtype=np.int8),
+                event_names=np.array(self.event_names, dtype=str),
+            )
+
+
+class Recording:
+    """A landmark recording loaded back from disk."""
+
+    def __init__(self, frame_size, timestamps, hand_counts, points, event_frames, event_hands, event_names):
+        self.frame_size = frame_size
+        self.timestamps = timestamps
+        self.hand_counts = hand_counts
+        self.points = points
+        self.event_frames = event_frames
+        self.event_hands = event_hands
+        self.event_names = event_names
+        # Offset of each frame's first hand in points
+        self.offsets = np.concatenate(([0], np.cumsum(hand_counts, dtype=np.int64)))
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def hands(self, frame_index):
+        """(hands, 21, 2) normalized landmarks of one frame."""
+        return self.points[self.offsets[frame_index]:self.offsets[frame_index + 1]]
+
+
+def load_recording(path):
+    with np.load(path, allow_pickle=False) as data:
+        return Recording(
+            tuple(int(v) for v in data["frame_size"]),
+            data["timestamps"],
+            data["hand_counts"].astype(np.int64),
+            data["points"],
+            data["event_frames"],
+            data["event_hands"],
+            data["event_names"],
+        )
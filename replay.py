@@ -0,0 +1,73 @@
+import argparse
+import time
+from collections import Counter, defaultdict
+from gesture_engine import GestureEngine, MultiHandGestureEngine, event_name
+from recording import load_recording
+from gesture_classifier import load_classifier
+
+
+class ReplayReport:
+    def __init__(self):
+        self.frames = 0
+        self.hands = 0
+        self.seconds = 0.0                   # Wall-clock time spent replaying
+        self.event_counts = Counter()        # Events detected during the replay
+        self.recorded_counts = Counter()     # Events detected when the session was recorded
+        self.event_times = defaultdict(list)  # Session time (s) of every replayed event
+
+    @property
+    def fps(self):
+        return self.frames / self.seconds if self.seconds else 0.0
+
+    def print(self, title):
+        print(title)
+        print(f"  frames: {self.frames}  hands: {self.hands}  replay time: {self.seconds:.3f}s  ({self.fps:.0f} frames/s)")
+        names = sorted(set(self.event_counts) | set(self.recorded_counts))
+        if not names:
+            print("  no gestures")
+        for name in names:
+            times = self.event_times.get(name, [])
+            first_last = f"first {times[0]:.2f}s, last {times[-1]:.2f}s" if times else "-"
+            print(f"  {name:<12} replayed {self.event_counts[name]:>5}  recorded {self.recorded_counts[name]:>5}  {first_last}")
+
+
+def replay(recording, engine_factory=GestureEngine, classifier=None):
+    """Feed a recording through the gesture logic as fast as possible.
+
+    The recorded timestamps drive the engine's timing, so the result only
+    depends on the recording and the detector code, not on the machine.
+    """
+    report = ReplayReport()
+    report.recorded_counts.update(str(name) for name in recording.event_names)
+
+    engine = MultiHandGestureEngine(engine_factory, classifier=classifier)
+    start_time = recording.timestamps[0] if len(recording) else 0.0
+
+    started = time.perf_counter()
+    for frame_index in range(len(recording)):
+        now = float(recording.timestamps[frame_index])
+        hands = recording.hands(frame_index)
+        for _, event in engine.process(hands, recording.frame_size, now):
+            name = event_name(event)
+            if name is not None:
+                report.event_counts[name] += 1
+                report.event_times[name].append(now - start_time)
+        report.hands += len(hands)
+        report.frames += 1
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded hand landmarks through the gesture detectors")
+    parser.add_argument("recordings", nargs="+", help=".npz files written by the gallery app's --record option")
+    parser.add_argument("--classifier", metavar="PATH", help="Use a classifier fitted by gesture_classifier.py instead of the hand-tuned rules")
+    args = parser.parse_args()
+
+    classifier = load_classifier(args.classifier) if args.classifier else None
+    for path in args.recordings:
+        replay(load_recording(path), classifier=classifier).print(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import numpy as np
+
+
+class HandROITracker:
+    """Runs a hand locator on a crop around the hands found in the previous frame.
+
+    locate(frame) and search(frame) must return the normalized landmarks of
+    the hands in the image they are given, as a (hands, 21, 2) array. The
+    tracker crops the frame to a square box around the last known hands
+    (plus a margin), runs locate on the crop and maps the landmarks back to
+    full-frame coordinates, so callers cannot tell the difference. Every
+    full_search_interval frames, so new hands can be picked up, and on the
+    frame after the crop came up empty, search runs on the whole frame
+    instead. That way every frame costs one inference.
+
+    locate and search must be separate MediaPipe instances (search ideally
+    in static image mode): MediaPipe carries the hand region of the last
+    image over to the next one, which is wrong for an image of different
+    geometry. For the same reason reset(), if given, is called whenever the
+    box changes, to clear the tracking state of locate. The box only moves
+    when the hand gets close to its edge, so that is rare.
+
+    MediaPipe scales every input to its fixed model size, so a crop does not
+    make inference cheaper; it makes a small or distant hand larger for the
+    models.
+    """
+
+    def __init__(self, locate, search, reset=None, margin=0.35, min_size=96, full_search_interval=30):
+        self.locate = locate
+        self.search = search
+        self.reset = reset
+        self.margin = margin                # Added on every side, as a fraction of the hand size
+        self.min_size = min_size            # Smallest crop side in pixels
+        self.full_search_interval = full_search_interval
+        self.box = None                     # (x0, y0, x1, y1) in frame pixels, None while not tracking
+        self.frames_since_full_search = 0
+        self.full_searches = 0              # Frames that were searched as a whole
+        self.lost = 0                       # Times the hand left the crop
+
+    def __call__(self, frame):
+        height, width = frame.shape[:2]
+        self.frames_since_full_search += 1
+        if self.box is not None and self.frames_since_full_search < self.full_search_interval:
+            x0, y0, x1, y1 = self.box
+            crop = np.ascontiguousarray(frame[y0:y1, x0:x1])
+            points = self.locate(crop)
+            if len(points):
+                # Back from crop-normalized to frame-normalized coordinates
+                points = points * np.array([(x1 - x0) / width, (y1 - y0) / height], dtype=np.float32)
+                points += np.array([x0 / width, y0 / height], dtype=np.float32)
+                self._track(points, width, height)
+                return points
+            # The hand left the crop; the whole frame is searched on the next one
+            self.lost += 1
+            self.box = None
+            return points
+
+        # Not tracking yet, tracking lost or a periodic full search
+        self.frames_since_full_search = 0
+        self.full_searches += 1
+        points = self.search(frame)
+        if len(points):
+            self._track(points, width, height)
+        else:
+            self.box = None
+        return points
+
+    def _track(self, points, width, height):
+        xs = points[..., 0] * width
+        ys = points[..., 1] * height
+        left, right, top, bottom = xs.min(), xs.max(), ys.min(), ys.max()
+        hand_size = max(right - left, bottom - top)
+
+        if self.box is not None:
+            # Keep the current box while the hand stays well inside it and it is not much too large
+            x0, y0, x1, y1 = self.box
+            inner = hand_size * self.margin / 2
+            if (x0 + inner <= left and right <= x1 - inner and y0 + inner <= top and bottom <= y1 - inner
+                    and x1 - x0 <= 2 * hand_size * (1 + 2 * self.margin)):
+                return
+
+        side = int(min(max(hand_size * (1 + 2 * self.margin), self.min_size), width, height))
+        center_x = (left + right) / 2
+        center_y = (top + bottom) / 2
+        x0 = int(min(max(center_x - side / 2, 0), width - side))
+        y0 = int(min(max(center_y - side / 2, 0), height - side))
+        box = (x0, y0, x0 + side, y0 + side)
+        if box != self.box:
+            # The hand region locate remembers belongs to the old crop
+            self.box = box
+            if self.reset is not None:
+                self.reset()
+
+    def close(self):
+        for locate in (self.locate, self.search):
+            close = getattr(locate, "close", None)
+            if close is not None:
+                close()
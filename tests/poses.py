@@ -0,0 +1,28 @@
+import numpy as np
+from benchmarks.cases import OPEN_HAND
+
+FRAME_SIZE = (400, 400)
+WRIST = (200, 300)
+
+
+def pose(moved=None, wrist=WRIST):
+    """(21, 2) pixel landmarks of OPEN_HAND at wrist, with the landmarks in moved ({index: (dx, dy)}) placed elsewhere."""
+    points = OPEN_HAND.copy()
+    for index, offset in (moved or {}).items():
+        points[index] = offset
+    return points + np.array(wrist, dtype=np.float32)
+
+
+def normalized(*hands):
+    """Stack pixel hands into the normalized (hands, 21, 2) array MediaPipe would return."""
+    return np.stack(hands) / np.array(FRAME_SIZE, dtype=np.float32)
+
+
+# One pose per rule of gestures.py, as offsets from the wrist
+OPEN = pose()
+CLICK = pose({4: (-27, -138)})                              # Thumb tip on the index tip
+CLICK_HELD = pose({4: (-8, -138)})                          # Thumb tip between the click entry and hold thresholds
+SCROLL = pose({4: (-13, -100), 12: (-32, -150)})            # Index and middle tips aligned, thumb tip on the ring pip
+ZOOM = pose({12: (-32, -150)})                              # Index and middle tips together, thumb tip away from the ring pip
+ZOOM_SPREAD = pose({8: (-32, -160), 12: (-32, -172)})       # ZOOM with the fingertips 20 px further from the thumb
+CLICK_AND_SCROLL = pose({4: (-20, -128), 12: (-32, -150)})  # Meets the click and the scroll rule at once
@@ -0,0 +1,46 @@
+import pytest
+import extract_gestures
+from extract_gestures import plan_segments
+
+
+@pytest.fixture
+def videos(monkeypatch):
+    # (fps, frame count) per path instead of opening files with OpenCV
+    info = {}
+    monkeypatch.setattr(extract_gestures, "video_info", lambda path: info[path])
+    return info
+
+
+def spans(segments):
+    return [(s.path, s.start, s.end, s.emit_from) for s in segments]
+
+
+def test_whole_files_without_segment_length(videos):
+    videos.update({"a.mp4": (30.0, 900), "b.mp4": (25.0, 100)})
+    assert spans(plan_segments(["a.mp4", "b.mp4"])) == [("a.mp4", 0, None, 0), ("b.mp4", 0, None, 0)]
+
+
+def test_unknown_frame_count_is_one_segment(videos):
+    videos["stream.mp4"] = (30.0, 0)
+    assert spans(plan_segments(["stream.mp4"], segment_seconds=10)) == [("stream.mp4", 0, None, 0)]
+
+
+def test_segments_replay_the_overlap_before_their_frames(videos):
+    videos["a.mp4"] = (25.0, 250)
+    segments = plan_segments(["a.mp4"], segment_seconds=4, overlap_seconds=2)
+    assert spans(segments) == [("a.mp4", 0, 100, 0), ("a.mp4", 50, 200, 100), ("a.mp4", 150, 250, 200)]
+    assert all(segment.fps == 25.0 for segment in segments)
+
+
+def test_reported_frames_cover_the_file_once(videos):
+    videos["a.mp4"] = (29.97, 1001)
+    segments = plan_segments(["a.mp4"], segment_seconds=3.3, overlap_seconds=1.5)
+    reported = [frame for segment in segments for frame in range(segment.emit_from, segment.end)]
+    assert reported == list(range(1001))
+    assert all(segment.start <= segment.emit_from for segment in segments)
+
+
+def test_segments_shorter_than_a_frame_are_one_frame(videos):
+    videos["a.mp4"] = (10.0, 3)
+    assert spans(plan_segments(["a.mp4"], segment_seconds=0.01, overlap_seconds=0)) == [
+        ("a.mp4", 0, 1, 0), ("a.mp4", 1, 2, 1), ("a.mp4", 2, 3, 2)]
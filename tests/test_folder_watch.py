@@ -0,0 +1,82 @@
+import os
+import pytest
+from folder_watch import FolderWatcher, scan_folder
+
+
+class Dispatcher:
+    # Collects what the watcher posts to the Tk thread, so the test can run it
+    def __init__(self):
+        self.posted = []
+
+    def post(self, func, *args):
+        self.posted.append((func, args))
+
+    def run(self):
+        for func, args in self.posted:
+            func(*args)
+        self.posted.clear()
+
+
+@pytest.fixture
+def watcher_for(monkeypatch):
+    # The background thread is not started, so the tests call _rescan themselves
+    monkeypatch.setattr(FolderWatcher, "_run", lambda self: None)
+
+    def create(folder, known=None):
+        changes, scans = [], []
+        watcher = FolderWatcher(str(folder), Dispatcher(), lambda *change: changes.append(change), known=known,
+                                on_scan=lambda images, *change: scans.append(change))
+        watcher.thread.join()
+        return watcher, changes, scans
+    return create
+
+
+def write(path, data=b"image"):
+    with open(path, "wb") as f:
+        f.write(data)
+    return str(path)
+
+
+def test_first_scan_adds_every_image_in_name_order(tmp_path, watcher_for):
+    b, a = write(tmp_path / "b.jpg"), write(tmp_path / "a.PNG")
+    write(tmp_path / "notes.txt")
+    os.mkdir(tmp_path / "folder.png")
+    watcher, changes, scans = watcher_for(tmp_path)
+
+    watcher._rescan()
+    assert scans == [([a, b], [], [])]
+    assert changes == []  # Not before the Tk thread runs the delivery
+    watcher.dispatcher.run()
+    assert changes == [([a, b], [], [])]
+
+
+def test_rescan_reports_the_difference_with_the_known_images(tmp_path, watcher_for):
+    kept, edited, deleted = (write(tmp_path / name) for name in ("kept.jpg", "edited.jpg", "deleted.jpg"))
+    known = scan_folder(str(tmp_path))
+    write(edited, b"edited image")
+    os.remove(deleted)
+    new = write(tmp_path / "new.jpeg")
+    watcher, changes, _ = watcher_for(tmp_path, known)
+
+    watcher._rescan()
+    watcher.dispatcher.run()
+    assert changes == [([new], [edited], [deleted])]
+    assert set(watcher.images) == {kept, edited, new}
+
+
+def test_unchanged_folder_posts_nothing(tmp_path, watcher_for):
+    write(tmp_path / "a.jpg")
+    watcher, _, scans = watcher_for(tmp_path, scan_folder(str(tmp_path)))
+
+    watcher._rescan()
+    assert scans == [] and watcher.dispatcher.posted == []
+
+
+def test_changes_are_dropped_after_stop(tmp_path, watcher_for):
+    write(tmp_path / "a.jpg")
+    watcher, changes, _ = watcher_for(tmp_path)
+
+    watcher._rescan()
+    watcher.stop(wait=True)
+    watcher.dispatcher.run()
+    assert changes == []
@@ -0,0 +1,70 @@
+import numpy as np
+from gesture_classifier import NO_GESTURE, GestureClassifier, hand_features, load_classifier, rule_predictions
+from poses import CLICK, OPEN, SCROLL, ZOOM, WRIST
+
+
+def jittered(hand, count, rng):
+    return hand + rng.normal(0, 1.5, (count, *hand.shape)).astype(np.float32)
+
+
+def labeled_hands(count=40, seed=0):
+    rng = np.random.default_rng(seed)
+    poses = {"click": CLICK, "scroll": SCROLL, "zoom": ZOOM, "none": OPEN}
+    points = np.concatenate([jittered(hand, count, rng) for hand in poses.values()])
+    labels = np.repeat(list(poses), count)
+    return points, labels
+
+
+def test_features_do_not_depend_on_hand_size_or_position():
+    scaled = (CLICK - WRIST) * 1.7 + (40, -60) + WRIST
+    assert np.allclose(hand_features(CLICK[np.newaxis]), hand_features(scaled[np.newaxis]), atol=1e-5)
+
+
+def test_fit_finds_the_clusters_and_rejects_outliers():
+    rng = np.random.default_rng(0)
+    features = np.concatenate([rng.normal(0, 1, (50, 2)), rng.normal(10, 1, (50, 2))])
+    classifier = GestureClassifier.fit(features, ["a"] * 50 + ["b"] * 50)
+    assert classifier.labels.tolist() == ["a", "b"]
+    assert classifier.predict(np.array([[0.0, 0.0], [10.0, 10.0], [40.0, -40.0]])).tolist() == ["a", "b", NO_GESTURE]
+
+
+def test_radius_covers_the_percentile_of_its_samples():
+    rng = np.random.default_rng(1)
+    features = rng.normal(0, 1, (200, 3))
+    classifier = GestureClassifier.fit(features, ["a"] * 200, radius_percentile=90)
+    assert np.mean(classifier.predict(features) == "a") == 0.9
+
+
+def test_conditions_agree_with_the_rules_on_their_poses():
+    points, labels = labeled_hands()
+    classifier = GestureClassifier.fit(hand_features(points), labels)
+    assert (rule_predictions(points) == labels).all()
+
+    entered, held = classifier.conditions(np.stack([CLICK, SCROLL, ZOOM, OPEN]))
+    assert [flags.tolist() for flags in entered] == [
+        [True, False, False, False], [False, True, False, False], [False, False, True, False]]
+    for entered_flags, held_flags in zip(entered, held):
+        assert not (entered_flags & ~held_flags).any()  # Holding is looser than entering
+
+
+def test_conditions_of_labels_the_classifier_lacks_are_false():
+    points, labels = labeled_hands()
+    known = labels != "zoom"
+    classifier = GestureClassifier.fit(hand_features(points[known]), labels[known])
+    entered, held = classifier.conditions(np.stack([ZOOM, CLICK]))
+    assert entered[2].tolist() == held[2].tolist() == [False, False]
+
+    entered, held = classifier.conditions(np.zeros((0, 21, 2), dtype=np.float32))
+    assert [len(flags) for flags in entered + held] == [0] * 6
+
+
+def test_save_writes_exactly_the_given_path(tmp_path):
+    points, labels = labeled_hands(count=10)
+    classifier = GestureClassifier.fit(hand_features(points), labels)
+    path = tmp_path / "gestures.model"
+    classifier.save(str(path))
+    assert [p.name for p in tmp_path.iterdir()] == ["gestures.model"]
+
+    loaded = load_classifier(str(path))
+    assert loaded.labels.tolist() == classifier.labels.tolist()
+    assert (loaded.predict(hand_features(points)) == classifier.predict(hand_features(points))).all()
@@ -0,0 +1,133 @@
+import numpy as np
+import gestures
+from benchmarks.cases import landmark_stream
+from gesture_engine import ACTIVE, ARMED, IDLE, RELEASED, GestureEngine, GestureState, MultiHandGestureEngine, event_name
+from poses import CLICK, CLICK_AND_SCROLL, CLICK_HELD, FRAME_SIZE, OPEN, SCROLL, ZOOM, ZOOM_SPREAD, normalized, pose
+
+
+def names(events):
+    return [name for name in map(event_name, events) if name is not None]
+
+
+def run(engine, frames):
+    """Feed pixel hands to a GestureEngine, one per frame, and return the names of all events."""
+    events = []
+    for now, points in enumerate(frames):
+        events.extend(engine.process(points, float(now)))
+    return names(events)
+
+
+def test_poses_meet_only_their_rules():
+    click, scroll, zoom = gestures.evaluate_hands(np.stack([OPEN, CLICK, SCROLL, ZOOM, ZOOM_SPREAD, CLICK_AND_SCROLL]))
+    assert click.tolist() == [False, True, False, False, False, True]
+    assert scroll.tolist() == [False, False, True, False, False, True]
+    assert zoom.tolist() == [False, False, False, True, True, False]
+
+
+def test_evaluate_hands_matches_the_scalar_rules():
+    points = landmark_stream(frames=300)
+    click, scroll, zoom = gestures.evaluate_hands(points)
+    assert click.tolist() == [bool(gestures.is_click_gesture(hand)) for hand in points]
+    assert scroll.tolist() == [bool(gestures.is_scroll_gesture(hand)) for hand in points]
+    assert zoom.tolist() == [bool(gestures.is_zoom_detected(hand)) for hand in points]
+    assert click.any() and not click.all()
+
+
+def test_state_arms_after_arm_frames_in_a_row():
+    state = GestureState("click", False, arm_frames=3)
+    assert state.step(True, True) is None and state.state == ARMED
+    assert state.step(False, True) is None and state.state == IDLE  # A gap restarts arming
+    assert [state.step(True, True) for _ in range(3)] == [None, None, "start"]
+    assert state.state == ACTIVE
+
+
+def test_state_holds_on_the_looser_condition_and_releases_after_release_frames():
+    state = GestureState("scroll", True, arm_frames=1, release_frames=2)
+    assert state.step(True, True) == "start"
+    assert state.step(False, True) is None and state.state == ACTIVE
+    assert state.step(False, False) is None and state.state == RELEASED
+    assert state.step(False, True) is None and state.state == ACTIVE  # A short dropout does not end it
+    assert state.step(False, False) is None
+    assert state.step(False, False) == "end" and state.state == IDLE
+
+
+def test_click_starts_once_and_ends_after_release():
+    engine = GestureEngine()
+    assert run(engine, [CLICK, CLICK, CLICK_HELD, CLICK_HELD, CLICK_HELD]) == ["click:start"]
+    assert engine.click.state == ACTIVE
+    assert run(engine, [OPEN, OPEN]) == ["click:end"]
+    assert engine.is_idle()
+
+
+def test_click_wins_over_scroll_on_the_same_frame():
+    engine = GestureEngine()
+    assert run(engine, [CLICK_AND_SCROLL, CLICK_AND_SCROLL]) == ["click:start"]
+    assert engine.click.state == ACTIVE and engine.scroll.state == IDLE
+
+
+def test_active_gesture_blocks_the_others():
+    engine = GestureEngine()
+    assert run(engine, [SCROLL, SCROLL]) == ["scroll:start"]
+    # The open hand still holds the scroll, so the click rule is ignored until it ends
+    assert run(engine, [CLICK, CLICK, CLICK]) == []
+    assert engine.scroll.state == ACTIVE and engine.click.state == IDLE
+
+
+def test_scroll_steps_follow_the_index_tip():
+    engine = GestureEngine()
+    down = pose({4: (-13, -100), 12: (-32, -150)}, wrist=(200, 325))
+    assert run(engine, [SCROLL, SCROLL, down]) == ["scroll:start", "scroll:down"]
+
+
+def test_step_scale_grows_the_scroll_step():
+    engine = GestureEngine()
+    engine.process(SCROLL, 0.0)
+    engine.process(SCROLL, 1.0)
+    down = pose({4: (-13, -100), 12: (-32, -150)}, wrist=(200, 325))
+    assert names(engine.process(down, 2.0, step_scale=2.0)) == []  # 25 px is less than a 40 px step
+    further = pose({4: (-13, -100), 12: (-32, -150)}, wrist=(200, 345))
+    assert names(engine.process(further, 3.0, step_scale=2.0)) == ["scroll:down"]
+
+
+def test_zoom_direction_follows_the_finger_spread():
+    engine = GestureEngine()
+    assert run(engine, [ZOOM, ZOOM, ZOOM_SPREAD, ZOOM_SPREAD, ZOOM]) == ["zoom:start", "zoom:in", "zoom:out"]
+
+
+def test_release_ends_a_gesture_when_the_hand_is_gone():
+    engine = GestureEngine()
+    run(engine, [CLICK, CLICK])
+    assert names(engine.release(2.0)) == []
+    assert names(engine.release(3.0)) == ["click:end"]
+
+
+def test_multi_hand_events_carry_the_hand_id():
+    engine = MultiHandGestureEngine()
+    left, right = OPEN - (100, 0), CLICK + (100, 0)
+    events = []
+    for now in range(2):
+        events.extend(engine.process(normalized(left, right), FRAME_SIZE, float(now)))
+    assert [(hand, event_name(event)) for hand, event in events] == [(1, "click:start")]
+    assert engine.ids == [0, 1]
+
+
+def test_multi_hand_ids_follow_the_wrists():
+    engine = MultiHandGestureEngine()
+    left, right = OPEN - (100, 0), OPEN + (100, 0)
+    engine.process(normalized(left, right), FRAME_SIZE, 0.0)
+    engine.process(normalized(right + (5, 0), left + (5, 0)), FRAME_SIZE, 1.0)  # MediaPipe swapped the order
+    assert engine.ids == [1, 0]
+
+
+def test_multi_hand_releases_only_the_hand_that_left():
+    engine = MultiHandGestureEngine()
+    left, right = CLICK - (100, 0), CLICK + (100, 0)
+    for now in range(2):
+        engine.process(normalized(left, right), FRAME_SIZE, float(now))
+
+    events = []
+    for now in range(2, 4):
+        events.extend(engine.process(normalized(left), FRAME_SIZE, float(now)))
+    assert [(hand, event_name(event)) for hand, event in events] == [(1, "click:end")]
+    assert list(engine.engines) == [0]
+    assert engine.engines[0].click.state == ACTIVE
@@ -0,0 +1,85 @@
+import json
+import os
+from PIL import Image
+from thumbnail_cache import ThumbnailCache
+
+
+def thumbnail(color=(200, 30, 30)):
+    return Image.new("RGB", (100, 80), color)
+
+
+def index_keys(cache):
+    with open(cache.index_path) as index_file:
+        return [key for key, _ in json.load(index_file)]
+
+
+def test_least_recently_used_is_evicted(tmp_path):
+    cache = ThumbnailCache(str(tmp_path))
+    cache.put("aa01", thumbnail())
+    cache.max_bytes = cache.total_bytes * 2  # Room for two thumbnails of this size
+    cache.put("bb02", thumbnail())
+    assert cache.get("aa01") is not None  # aa01 is now more recent than bb02
+
+    cache.put("cc03", thumbnail())
+    assert list(cache.entries) == ["aa01", "cc03"]
+    assert not os.path.exists(cache._file_path("bb02"))
+    assert cache.get("bb02") is None
+    assert cache.total_bytes == sum(cache.entries.values()) <= cache.max_bytes
+
+
+def test_index_keeps_the_order_across_runs(tmp_path):
+    cache = ThumbnailCache(str(tmp_path))
+    for key in ("aa01", "bb02", "cc03"):
+        cache.put(key, thumbnail())
+    cache.get("aa01")
+    cache.flush(final=True)
+
+    reopened = ThumbnailCache(str(tmp_path))
+    assert list(reopened.entries) == ["bb02", "cc03", "aa01"]
+    assert reopened.total_bytes == cache.total_bytes
+    assert not reopened.dirty
+
+
+def test_hits_are_only_written_by_the_final_flush(tmp_path):
+    cache = ThumbnailCache(str(tmp_path))
+    cache.put("aa01", thumbnail())
+    cache.put("bb02", thumbnail())
+    cache.flush()
+
+    cache.get("aa01")
+    assert not cache.dirty and cache.touched
+    cache.flush()
+    assert index_keys(cache) == ["aa01", "bb02"]
+    cache.flush(final=True)
+    assert index_keys(cache) == ["bb02", "aa01"]
+
+
+def test_reconcile_adopts_orphans_and_drops_missing_files(tmp_path):
+    cache = ThumbnailCache(str(tmp_path))
+    cache.put("aa01", thumbnail())
+    cache.put("bb02", thumbnail())
+    cache.flush()
+    cache.put("cc03", thumbnail())  # Written after the last flush, like before a crash
+    os.remove(cache._file_path("bb02"))
+
+    reopened = ThumbnailCache(str(tmp_path))
+    assert list(reopened.entries) == ["cc03", "aa01"]  # The orphan counts as least recently used
+    assert reopened.total_bytes == sum(reopened.entries.values())
+    assert reopened.dirty
+
+
+def test_get_thumbnail_decodes_once_per_file_version(tmp_path):
+    path = str(tmp_path / "photo.png")
+    Image.new("RGB", (640, 480), (10, 120, 200)).save(path)
+    cache = ThumbnailCache(str(tmp_path / "cache"))
+
+    first = cache.get_thumbnail(path)
+    assert first.size == (100, 75)
+    assert cache.lookup(path) is not None
+    assert len(cache.entries) == 1
+
+    Image.new("RGB", (320, 480), (10, 120, 200)).save(path)
+    os.utime(path, ns=(0, 10 ** 9))  # The edit must be visible even on coarse file system clocks
+    assert cache.lookup(path) is None
+    assert cache.get_thumbnail(path).size == (67, 100)
+    assert len(cache.entries) == 2
@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from PIL import Image
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "hci_image_gallery", "thumbnails")
+
+PNG_MODES = ("1", "L", "LA", "P", "RGB", "RGBA", "I", "I;16")  # Modes Pillow can save as PNG
+
+ORIENTATION_TAG = 0x0112  # EXIF orientation
+
+
+def decode_thumbnail_info(path, size):
+    """Decode an image straight to thumbnail size; return (thumbnail, (width, height), EXIF orientation).
+
+    For JPEGs, draft mode lets the decoder scale the DCT blocks by 1/2, 1/4
+    or 1/8, so a large photo is never decoded at full resolution. The size
+    is that of the original image, read from its header.
+    """
+    with Image.open(path) as img:
+        full_size = img.size  # Read before draft mode shrinks it
+        orientation = img.getexif().get(ORIENTATION_TAG, 1)
+        img.draft(None, size)
+        img.thumbnail(size)  # Loads the pixel data, so img stays usable after the file is closed
+    if img.mode not in PNG_MODES:
+        img = img.convert("RGB")  # E.g. CMYK JPEGs, which could not be cached otherwise
+    return img, full_size, orientation
+
+
+def decode_thumbnail(path, size):
+    """Decode an image straight to thumbnail size, see decode_thumbnail_info."""
+    return decode_thumbnail_info(path, size)[0]
+
+
+class ThumbnailCache:
+    """Persistent thumbnail cache in a sharded directory with a byte budget.
+
+    Thumbnails are keyed by the image path, modification time, file size and
+    thumbnail size, so an edited file gets a new entry. When the cache grows
+    past max_bytes, the least recently used thumbnails are deleted first.
+    The LRU order is kept in index.json, written by flush().
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=256 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # key -> file size in bytes, least recently used first
+        self.total_bytes = 0
+        self.dirty = False  # Entries were added or removed since the last flush
+        self.touched = False  # Only the LRU order changed, which is written on the final flush
+
+        os.makedirs(cache_dir, exist_ok=True)
+        try:
+            with open(self.index_path) as index_file:
+                for key, size in json.load(index_file):
+                    self.entries[key] = size
+                    self.total_bytes += size
+        except (OSError, ValueError):
+            pass  # No index yet or an unreadable one; start empty
+        self._reconcile()
+
+    def _reconcile(self):
+        # Thumbnails written after the last flush (e.g. before a crash) are missing from the index:
+        # they are counted as the least recently used, and entries whose file is gone are dropped
+        on_disk = {}
+        for shard in os.scandir(self.cache_dir):
+            if shard.is_dir() and len(shard.name) == 2:
+                for entry in os.scandir(shard.path):
+                    if entry.name.endswith(".png"):
+                        on_disk[entry.name[:-4]] = entry.stat().st_size
+
+        entries = OrderedDict((key, size) for key, size in on_disk.items() if key not in self.entries)
+        for key in self.entries:
+            if key in on_disk:
+                entries[key] = on_disk[key]
+        self.dirty = list(entries.items()) != list(self.entries.items())
+        self.entries = entries
+        self.total_bytes = sum(entries.values())
+
+    def key(self, path, size):
+        stat = os.stat(path)
+        text = f"{os.path.abspath(path)}|{stat.st_mtime_ns}|{stat.st_size}|{size[0]}x{size[1]}"
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def _file_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + ".png")
+
+    def get(self, key):
+        """Return the cached thumbnail for key, or None."""
+        with self.lock:
+            if key not in self.entries:
+                return None
+            self.entries.move_to_end(key)
+            self.touched = True
+        try:
+            with Image.open(self._file_path(key)) as img:
+                img.load()
+                return img
+        except OSError:
+            self._forget(key)  # The file was removed behind our back
+            return None
+
+    def put(self, key, img):
+        file_path = self._file_path(key)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        img.save(file_path, "PNG")
+        size = os.path.getsize(file_path)
+
+        with self.lock:
+            self.total_bytes += size - self.entries.pop(key, 0)
+            self.entries[key] = size
+            self.dirty = True
+            evicted = []
+            while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+                old_key, old_size = self.entries.popitem(last=False)
+                self.total_bytes -= old_size
+                evicted.append(old_key)
+        for old_key in evicted:
+            try:
+                os.remove(self._file_path(old_key))
+            except OSError:
+                pass
+
+    def _forget(self, key):
+        with self.lock:
+            self.total_bytes -= self.entries.pop(key, 0)
+            self.dirty = True
+
+    def lookup(self, path, size=(100, 100)):
+        """Return the cached thumbnail of the image at path without ever decoding it, or None."""
+        try:
+            return self.get(self.key(path, size))
+        except OSError:
+            return None
+
+    def get_thumbnail(self, path, size=(100, 100)):
+        """Return a thumbnail of the image at path, decoding the original only on a cache miss."""
+        key = self.key(path, size)
+        img = self.get(key)
+        if img is None:
+            img = decode_thumbnail(path, size)
+            try:
+                self.put(key, img)
+            except OSError as e:
+                print(f"Could not cache the thumbnail of {path}: {e}")  # Still shown, just decoded again next time
+        return img
+
+    def flush(self, final=False):
+        """Persist the LRU order so the next run starts warm.
+
+        Cache hits only reorder the entries, so they are written when final is set (on exit).
+        """
+        with self.lock:
+            if not (self.dirty or final and self.touched):
+                return
+            entries = list(self.entries.items())
+            self.dirty = self.touched = False
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, "w") as index_file:
+            json.dump(entries, index_file)
+        os.replace(temp_path, self.index_path)
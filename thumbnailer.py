@@ -0,0 +1,104 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Delivered instead of an image when still_wanted() said the thumbnail is no longer needed
+SKIPPED = object()
+
+
+class ThumbnailLoader:
+    """Generates thumbnails on a thread pool and streams them to the Tk thread in batches.
+
+    Pillow releases the GIL while decoding, so a thread pool decodes several
+    JPEGs in parallel. Thumbnails finished while the Tk thread was busy are
+    delivered together in one on_batch call, so the grid fills progressively.
+    Every request can be cancelled on its own, so callers sharing the loader
+    do not drop each other's work.
+    """
+
+    def __init__(self, cache, dispatcher, workers=None):
+        self.cache = cache
+        self.dispatcher = dispatcher
+        self.executor = ThreadPoolExecutor(max_workers=workers or min(8, os.cpu_count() or 1), thread_name_prefix="thumbnail")
+        self.lock = threading.Lock()
+        self.closed = False
+        self.pending = []  # (request, index, image or None) decoded but not yet delivered
+
+    def request(self, items, on_batch, on_done=None, size=(100, 100), still_wanted=None):
+        """Decode thumbnails for (index, path) pairs and return the ThumbnailRequest, which can be cancelled.
+
+        on_batch(list of (index, image)) runs on the Tk thread as thumbnails
+        become ready; image is None if the file could not be decoded.
+        on_done() runs once the last thumbnail has been delivered.
+        still_wanted(index) is checked right before decoding, so work for
+        items that scrolled out of view in the meantime is skipped; those are
+        delivered as SKIPPED.
+        """
+        request = ThumbnailRequest(on_batch, on_done, len(items))
+        if not items:
+            if on_done is not None:
+                on_done()
+            return request
+
+        for index, path in items:
+            self.executor.submit(self._decode, request, index, path, size, still_wanted)
+        return request
+
+    def _decode(self, request, index, path, size, still_wanted):
+        if request.cancelled or self.closed:
+            return
+        if still_wanted is not None and not still_wanted(index):
+            img = SKIPPED  # The caller asks again if it needs it
+        else:
+            try:
+                img = self.cache.get_thumbnail(path, size)
+            except Exception as e:
+                print(f"Error loading {path}: {e}")
+                img = None
+
+        with self.lock:
+            if request.cancelled or self.closed:
+                return
+            schedule = not self.pending  # The first result of a batch schedules its delivery
+            self.pending.append((request, index, img))
+        if schedule:
+            self.dispatcher.post(self._deliver)
+
+    def _deliver(self):
+        with self.lock:
+            pending, self.pending = self.pending, []
+
+        # Results of several requests may arrive together; each gets its own batch
+        batches = {}
+        for request, index, img in pending:
+            if not request.cancelled and not self.closed:
+                batches.setdefault(request, []).append((index, img))
+        for request, batch in batches.items():
+            request.deliver(batch)
+
+    def shutdown(self, wait=False):
+        """Drop all queued work; with wait, also wait for the thumbnails being decoded right now."""
+        with self.lock:
+            self.closed = True
+            self.pending = []
+        self.executor.shutdown(wait=wait, cancel_futures=True)
+
+
+class ThumbnailRequest:
+    def __init__(self, on_batch, on_done, count):
+        self.on_batch = on_batch
+        self.on_done = on_done
+        self.remaining = count
+        self.cancelled = False
+
+    def cancel(self):
+        """Drop the thumbnails of this request that have not been delivered yet; called on the Tk thread."""
+        self.cancelled = True
+
+    def deliver(self, batch):
+        self.on_batch(batch)
+
+        self.remaining -= len(batch)
+        if self.remaining == 0:
+            if self.on_done is not None:
+                self.on_done()
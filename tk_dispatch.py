@@ -0,0 +1,32 @@
+import queue
+
+
+class TkDispatcher:
+    """Runs callbacks posted from worker threads on the Tk thread.
+
+    Tk widgets may only be touched from the thread running mainloop, so
+    background work posts its results here and they are executed by a
+    periodic root.after poll.
+    """
+
+    def __init__(self, root, interval_ms=15):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.callbacks = queue.SimpleQueue()
+        self.root.after(self.interval_ms, self._poll)
+
+    def post(self, callback, *args):
+        """Schedule callback(*args) on the Tk thread. Safe to call from any thread."""
+        self.callbacks.put((callback, args))
+
+    def _poll(self):
+        while True:
+            try:
+                callback, args = self.callbacks.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"Error in background callback: {e}")
+        self.root.after(self.interval_ms, self._poll)
@@ -0,0 +1,258 @@
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+
+# One background worker is enough: only the pyramid of the open image matters
+_pyramid_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pyramid")
+
+
+class ImagePyramid:
+    """Power-of-two downscaled copies of an image, built lazily in the background.
+
+    Level k is the image reduced by 2**k. Level 0 is the image itself and is
+    always available; coarser levels appear as the background build finishes
+    them, and lookups fall back to the nearest finer level until then.
+    """
+
+    def __init__(self, image, min_size=128):
+        image.load()  # Decode once here so the builder thread and render() never load it concurrently
+        if image.mode not in ("RGB", "RGBA", "L"):
+            image = image.convert("RGB")
+        self.levels = [image]
+        self.min_size = min_size
+        self.lock = threading.Lock()
+        self.cancelled = False
+        _pyramid_executor.submit(self._build)
+
+    def _build(self):
+        level = self.levels[0]
+        while max(level.size) // 2 >= self.min_size and not self.cancelled:
+            level = level.reduce(2)  # Box filter; each level costs a quarter of the previous one
+            with self.lock:
+                self.levels.append(level)
+
+    def cancel(self):
+        """Stop building levels, e.g. because another image was opened."""
+        self.cancelled = True
+
+    def level_for(self, scale):
+        """Return (k, image) for the coarsest level that still has enough detail for scale."""
+        with self.lock:
+            k = 0
+            while k + 1 < len(self.levels) and scale * 2 ** (k + 1) <= 1:
+                k += 1
+            return k, self.levels[k]
+
+
+def fit_to_viewport(image, viewport, resample=Image.Resampling.BILINEAR):
+    """Scale an image to fit the viewport and center it on a white background."""
+    scale = min(viewport[0] / image.size[0], viewport[1] / image.size[1])
+    size = (max(1, int(image.size[0] * scale)), max(1, int(image.size[1] * scale)))
+    centered_image = Image.new("RGB", viewport, "white")
+    centered_image.paste(image.resize(size, resample), ((viewport[0] - size[0]) // 2, (viewport[1] - size[1]) // 2))
+    return centered_image
+
+
+class ZoomView:
+    """Renders a fixed-size viewport of an image at any zoom, serving each step from the pyramid.
+
+    Only the part of the pyramid level that falls inside the viewport is
+    cropped and resampled, so a zoom step costs about the same whatever the
+    size of the original photo.
+    """
+
+    def __init__(self, image, viewport=(400, 300), min_zoom=0.1, max_scale=8.0):
+        self.pyramid = ImagePyramid(image)
+        self.image_size = image.size
+        self.viewport = viewport
+        # Scale at which the whole image fits the viewport; zoom is relative to it
+        self.fit_scale = min(viewport[0] / image.size[0], viewport[1] / image.size[1])
+        self.zoom = 1.0
+        self.min_zoom = min_zoom
+        self.max_zoom = max(1.0, max_scale / self.fit_scale)
+
+    @property
+    def scale(self):
+        return self.fit_scale * self.zoom
+
+    def zoom_by(self, factor):
+        self.zoom = min(self.max_zoom, max(self.min_zoom, self.zoom * factor))
+
+    def close(self):
+        self.pyramid.cancel()
+
+    def render(self):
+        """Return the viewport as an RGB image, with the image centered in it."""
+        viewport_width, viewport_height = self.viewport
+        scale = self.scale
+        display_width = max(1, int(self.image_size[0] * scale))
+        display_height = max(1, int(self.image_size[1] * scale))
+
+        # Part of the scaled image inside the viewport, in display coordinates
+        visible_width = min(display_width, viewport_width)
+        visible_height = min(display_height, viewport_height)
+        left = (display_width - visible_width) // 2
+        top = (display_height - visible_height) // 2
+
+        # The same region in the coordinates of the chosen pyramid level
+        k, level = self.pyramid.level_for(scale)
+        level_scale = scale * 2 ** k
+        box = (
+            left / level_scale,
+            top / level_scale,
+            min(level.size[0], (left + visible_width) / level_scale),
+            min(level.size[1], (top + visible_height) / level_scale),
+        )
+        region = level.resize((visible_width, visible_height), Image.Resampling.LANCZOS, box=box)
+
+        centered_image = Image.new("RGB", self.viewport, "white")
+        x_offset = (viewport_width - visible_width) // 2
+        y_offset = (viewport_height - visible_height) // 2
+        centered_image.paste(region, (x_offset, y_offset))
+        return centered_image
+
+
+class RenderCache:
+    """LRU of viewer-size renders, bounded by their total size in bytes.
+
+    Entries are keyed by path and remember the file's modification time, so
+    an image edited on disk is rendered again. Safe to use from any thread.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # path -> (mtime_ns, image), least recently used first
+        self.total_bytes = 0
+
+    @staticmethod
+    def _mtime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def get(self, path):
+        mtime = self._mtime(path)
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry is None or entry[0] != mtime:
+                return None
+            self.entries.move_to_end(path)
+            return entry[1]
+
+    def __contains__(self, path):
+        return self.get(path) is not None
+
+    def put(self, path, image):
+        mtime = self._mtime(path)
+        size = image.width * image.height * len(image.getbands())
+        with self.lock:
+            old = self.entries.pop(path, None)
+            if old is not None:
+                self.total_bytes -= old[1].width * old[1].height * len(old[1].getbands())
+            self.entries[path] = (mtime, image)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.total_bytes -= evicted.width * evicted.height * len(evicted.getbands())
+
+
+class ImageOpener:
+    """Opens images for the viewer off the Tk thread; the newest request wins.
+
+    Each open first delivers a quick preview from a draft-mode decode, then the
+    full-quality ZoomView once the original is decoded. Opening another image
+    cancels the previous request: it is dropped if it has not started yet, and
+    its remaining stages are skipped if it has.
+
+    prefetch() renders images the user is likely to open next (the neighbors
+    of the selected one) at viewer size into a RenderCache. Opening one of
+    them shows the final-quality render immediately, on the Tk thread.
+    """
+
+    def __init__(self, dispatcher, viewport=(400, 300), cache_bytes=64 * 1024 * 1024, prefetch_workers=2):
+        self.dispatcher = dispatcher
+        self.viewport = viewport
+        self.cache = RenderCache(cache_bytes)
+        # Two workers, so a new preview never waits behind an old full decode
+        self.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="image-open")
+        # Prefetching has its own pool, so it never delays the image that was actually opened
+        self.prefetch_executor = ThreadPoolExecutor(max_workers=prefetch_workers, thread_name_prefix="image-prefetch")
+        self.generation = 0
+        self.prefetch_generation = 0
+        self.future = None
+
+    def open(self, path, on_preview, on_ready):
+        """on_preview(image) and on_ready(zoom_view, image) are called on the Tk thread.
+
+        On a cache hit on_preview is called before open() returns.
+        """
+        self.generation += 1
+        if self.future is not None:
+            self.future.cancel()
+        rendered = self.cache.get(path)
+        if rendered is not None:
+            on_preview(rendered)
+        self.future = self.executor.submit(self._open, self.generation, path, on_preview, on_ready, rendered is None)
+
+    def prefetch(self, paths):
+        """Render paths at viewer size in the background, in order; replaces the previous prefetch list."""
+        self.prefetch_generation += 1
+        for path in paths:
+            if path not in self.cache:
+                self.prefetch_executor.submit(self._prefetch, self.prefetch_generation, path)
+
+    def _prefetch(self, generation, path):
+        if generation != self.prefetch_generation or path in self.cache:
+            return  # The selection moved on, or the image was opened meanwhile
+        try:
+            with Image.open(path) as img:
+                img.draft(None, self.viewport)  # Plenty of detail left for a viewport-size render
+                rendered = fit_to_viewport(img, self.viewport, Image.Resampling.LANCZOS)
+            self.cache.put(path, rendered)
+        except Exception as e:
+            print(f"Error prefetching image: {e}")
+
+    def cancel(self):
+        self.generation += 1
+
+    def _open(self, generation, path, on_preview, on_ready, show_preview=True):
+        try:
+            if show_preview:
+                # Stage 1: let the JPEG decoder downscale while decoding, just enough for the viewport
+                with Image.open(path) as img:
+                    img.draft(None, self.viewport)
+                    preview = fit_to_viewport(img, self.viewport)
+                if generation != self.generation:
+                    return
+                self.dispatcher.post(self._deliver_preview, generation, on_preview, preview)
+
+            # Stage 2: full decode and a high quality render of the fitted view
+            zoom_view = ZoomView(Image.open(path), self.viewport)
+            if generation != self.generation:
+                zoom_view.close()
+                return
+            rendered = zoom_view.render()
+            self.cache.put(path, rendered)
+            self.dispatcher.post(self._deliver_ready, generation, on_ready, zoom_view, rendered)
+        except Exception as e:
+            print(f"Error loading image: {e}")
+
+    def _deliver_preview(self, generation, on_preview, preview):
+        if generation == self.generation:
+            on_preview(preview)
+
+    def _deliver_ready(self, generation, on_ready, zoom_view, rendered):
+        if generation == self.generation:
+            on_ready(zoom_view, rendered)
+        else:
+            zoom_view.close()
+
+    def shutdown(self):
+        self.cancel()
+        self.prefetch_generation += 1
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.prefetch_executor.shutdown(wait=False, cancel_futures=True)